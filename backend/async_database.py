@@ -0,0 +1,64 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .database import execute_query, execute_read_query, set_session
+from .metrics import metrics
+
+_executor = None
+_executor_lock = threading.Lock()
+_session_source = None
+
+def get_executor():
+    """Return the bounded thread pool that runs blocking database calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # More workers than pooled connections would only queue on the pool
+                workers = int(os.getenv('DB_EXECUTOR_WORKERS', os.getenv('DB_POOL_SIZE', '5')))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+    return _executor
+
+def shutdown_executor():
+    """Stop the database thread pool (e.g. on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+def set_session_source(source):
+    """Register a callable returning the caller's session key; run_db tags its calls with it.
+
+    The key gives each browser read-your-writes on top of read replicas
+    (see database.set_session).
+    """
+    global _session_source
+    _session_source = source
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking backend function on the database thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    if _session_source is not None:
+        context.run(set_session, _session_source())
+    call = functools.partial(context.run, func, *args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(get_executor(), call)
+    finally:
+        # Includes time queued for a worker thread, unlike the per-query timings
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        metrics.observe('roomify_backend_call_seconds', (('function', name),), time.perf_counter() - started)
+
+async def execute_query_async(query, params=None):
+    """Awaitable counterpart of execute_query."""
+    return await run_db(execute_query, query, params)
+
+async def execute_read_query_async(query, params=None):
+    """Awaitable counterpart of execute_read_query."""
+    return await run_db(execute_read_query, query, params)
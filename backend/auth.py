@@ -1,44 +1,58 @@
-import bcrypt
-from .database import execute_query, execute_read_query
+from .database import execute_named_read_query, execute_query, execute_read_query, register_query
+from .async_database import run_db
+from .hashing import HashingBusyError, get_hashing_service
 
-def hash_password(password):
-    """Hash a password for storing."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(stored_password, provided_password):
-    """Verify a stored password against one provided by user."""
-    return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password.encode('utf-8'))
-
-def register_user(name, email, phone, password):
+async def register_user(name, email, phone, password):
     """Register a new user."""
     # Check if user already exists
-    users = execute_read_query("SELECT * FROM USER WHERE `e-mail` = %s", (email,))
+    users = await run_db(execute_read_query, "SELECT user_id FROM USER WHERE `e-mail` = %s", (email,))
     if users:
         return False, "User with this email already exists."
 
-    hashed_password = hash_password(password)
+    try:
+        hashed_password = await get_hashing_service().hash_password(password)
+    except HashingBusyError:
+        return False, "Server is busy, please try again."
     query = "INSERT INTO USER (name, `e-mail`, phone, password) VALUES (%s, %s, %s, %s)"
     params = (name, email, phone, hashed_password)
-    
-    if execute_query(query, params):
+
+    if await run_db(execute_query, query, params):
         return True, "Registration successful!"
     else:
         return False, "Registration failed."
 
-def login_user(email, password):
+register_query('find_accounts', """
+    SELECT 'user' AS user_type, user_id AS account_id, name, phone, password
+    FROM USER WHERE `e-mail` = %s
+    UNION ALL
+    SELECT 'admin' AS user_type, admin_id AS account_id, name, NULL AS phone, password
+    FROM Admin WHERE email = %s
+""")
+
+def find_accounts(email):
+    """Find the user and/or admin account for an email in a single query."""
+    rows = execute_named_read_query('find_accounts', (email, email)) or []
+    accounts = []
+    for row in sorted(rows, key=lambda r: r['user_type'] != 'user'):
+        if row['user_type'] == 'user':
+            account = {'user_id': row['account_id'], 'name': row['name'], 'e-mail': email,
+                       'phone': row['phone'], 'password': row['password']}
+        else:
+            account = {'admin_id': row['account_id'], 'name': row['name'], 'email': email,
+                       'password': row['password']}
+        accounts.append((row['user_type'], account))
+    return accounts
+
+async def login_user(email, password):
     """Log in a user or admin with unified authentication."""
-    # First, check if it's a user
-    users = execute_read_query("SELECT * FROM USER WHERE `e-mail` = %s", (email,))
-    if users:
-        user = users[0]
-        if verify_password(user['password'], password):
-            return {**user, 'user_type': 'user'}, "Login successful!"
-    
-    # If not found in USER table, check Admin table
-    admins = execute_read_query("SELECT * FROM Admin WHERE email = %s", (email,))
-    if admins:
-        admin = admins[0]
-        if verify_password(admin['password'], password):
-            return {**admin, 'user_type': 'admin'}, "Admin login successful!"
-    
+    # Users take precedence over admins sharing the same email
+    for user_type, account in await run_db(find_accounts, email):
+        try:
+            matches = await get_hashing_service().verify_password(account['password'], password)
+        except HashingBusyError:
+            return None, "Server is busy, please try again."
+        if matches:
+            message = "Admin login successful!" if user_type == 'admin' else "Login successful!"
+            return {**account, 'user_type': user_type}, message
+
     return None, "Invalid email or password."
@@ -0,0 +1,189 @@
+import bisect
+import os
+import threading
+from datetime import date, datetime
+from .database import execute_read_query, primary_reads
+from .invalidation import subscribe
+
+ACTIVE_STATUSES = ('Pending', 'Confirmed')
+
+def to_date(value):
+    """Accept a date, datetime or 'YYYY-MM-DD' string and return a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class _RoomStays:
+    """Active stays of one room, sorted by check-in date.
+
+    max_end[i] is the latest check-out among the first i+1 stays, so an
+    overlap query is one bisect plus one lookup even if legacy rows overlap.
+    """
+
+    __slots__ = ('starts', 'ends', 'ids', 'max_end')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.max_end = []
+
+    def add(self, booking_id, check_in, check_out):
+        i = bisect.bisect_right(self.starts, check_in)
+        self.starts.insert(i, check_in)
+        self.ends.insert(i, check_out)
+        self.ids.insert(i, booking_id)
+        self._rebuild_max_end(i)
+
+    def remove(self, booking_id):
+        i = self.ids.index(booking_id)
+        del self.starts[i], self.ends[i], self.ids[i]
+        self._rebuild_max_end(i)
+
+    def overlaps(self, check_in, check_out):
+        # Stays starting before check_out may overlap; the latest end among them decides
+        i = bisect.bisect_left(self.starts, check_out)
+        return i > 0 and self.max_end[i - 1] > check_in
+
+    def _rebuild_max_end(self, start):
+        del self.max_end[start:]
+        running = self.max_end[-1] if self.max_end else None
+        for end in self.ends[start:]:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+
+class AvailabilityIndex:
+    """In-process index of Pending/Confirmed stays per room.
+
+    Stays are half-open [check_in, check_out), matching CONFLICT_QUERY.
+    MySQL stays the source of truth: the index is loaded once and kept in
+    step by the booking write paths of this process.
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._booking_rooms = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def load(self, rows):
+        """Replace the index contents with booking rows from the database."""
+        with self._lock:
+            self._rooms = {}
+            self._booking_rooms = {}
+            for row in rows:
+                self._add(row['booking_id'], row['room_id'], row['check_in_date'], row['check_out_date'])
+            self.loaded = True
+
+    def add(self, booking_id, room_id, check_in, check_out):
+        with self._lock:
+            self.remove(booking_id)
+            self._add(booking_id, room_id, check_in, check_out)
+
+    def remove(self, booking_id):
+        with self._lock:
+            room_id = self._booking_rooms.pop(booking_id, None)
+            if room_id is not None:
+                stays = self._rooms[room_id]
+                stays.remove(booking_id)
+                if not stays.ids:
+                    del self._rooms[room_id]
+
+    def drop_room(self, room_id):
+        with self._lock:
+            stays = self._rooms.pop(room_id, None)
+            if stays:
+                for booking_id in stays.ids:
+                    self._booking_rooms.pop(booking_id, None)
+
+    def is_available(self, room_id, check_in, check_out):
+        with self._lock:
+            stays = self._rooms.get(room_id)
+            return not stays or not stays.overlaps(to_date(check_in), to_date(check_out))
+
+    def booked_rooms(self, check_in, check_out):
+        """Room ids with an active stay overlapping [check_in, check_out)."""
+        check_in, check_out = to_date(check_in), to_date(check_out)
+        with self._lock:
+            return {room_id for room_id, stays in self._rooms.items() if stays.overlaps(check_in, check_out)}
+
+    def rooms_active_on_or_after(self, day):
+        """Room ids with an active stay whose check-out is on or after day."""
+        day = to_date(day)
+        with self._lock:
+            return {room_id for room_id, stays in self._rooms.items() if stays.max_end[-1] >= day}
+
+    def _add(self, booking_id, room_id, check_in, check_out):
+        stays = self._rooms.get(room_id)
+        if stays is None:
+            stays = self._rooms[room_id] = _RoomStays()
+        stays.add(booking_id, to_date(check_in), to_date(check_out))
+        self._booking_rooms[booking_id] = room_id
+
+
+availability_index = AvailabilityIndex()
+
+def load_availability_index():
+    """Load active stays into the index (called once at startup)."""
+    if os.getenv('AVAILABILITY_INDEX', '1') != '1':
+        return False
+    # The index decides availability, so it must not start behind a replica
+    with primary_reads():
+        rows = execute_read_query("""
+            SELECT booking_id, room_id, check_in_date, check_out_date
+            FROM Booking
+            WHERE status IN ('Pending', 'Confirmed')
+            AND check_out_date >= CURDATE()
+        """)
+    if rows is None:
+        print("Availability index not loaded; falling back to database queries")
+        return False
+    availability_index.load(rows)
+    return True
+
+def refresh_booking(booking_id, status):
+    """Bring one booking's entry in line after its status changed."""
+    refresh_bookings([booking_id], status)
+
+def refresh_bookings(booking_ids, status):
+    """Bring several bookings' entries in line after they all moved to status."""
+    if not availability_index.loaded or not booking_ids:
+        return
+    if status not in ACTIVE_STATUSES:
+        for booking_id in booking_ids:
+            availability_index.remove(booking_id)
+        return
+    placeholders = ', '.join(['%s'] * len(booking_ids))
+    rows = execute_read_query(
+        f"SELECT booking_id, room_id, check_in_date, check_out_date FROM Booking WHERE booking_id IN ({placeholders})",
+        tuple(booking_ids),
+    )
+    for row in rows or []:
+        availability_index.add(row['booking_id'], row['room_id'], row['check_in_date'], row['check_out_date'])
+
+def reload_bookings(booking_ids):
+    """Re-read bookings another worker changed and update their index entries."""
+    if not availability_index.loaded or not booking_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(booking_ids))
+    rows = execute_read_query(
+        f"SELECT booking_id, room_id, status, check_in_date, check_out_date FROM Booking WHERE booking_id IN ({placeholders})",
+        tuple(booking_ids),
+    )
+    if rows is None:
+        return
+    for row in rows:
+        if row['status'] in ACTIVE_STATUSES:
+            availability_index.add(row['booking_id'], row['room_id'], row['check_in_date'], row['check_out_date'])
+        else:
+            availability_index.remove(row['booking_id'])
+    found = {row['booking_id'] for row in rows}
+    for booking_id in booking_ids:
+        if booking_id not in found:
+            availability_index.remove(booking_id)
+
+subscribe('bookings', reload_bookings)
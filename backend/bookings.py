@@ -1,54 +1,117 @@
-from .database import execute_query, execute_read_query
-from datetime import datetime
+from mysql.connector import Error
+from .database import execute_named_read_query, execute_read_query, register_query, transaction
+from .availability import availability_index, refresh_booking, refresh_bookings
+from .invalidation import publish_ids
+from .occupancy import add_stay, sync_stays
+from .pricing import quote_stays
 
-def calculate_total_cost(price_per_night, check_in, check_out):
-    """Calculate total cost based on number of nights."""
-    check_in_date = datetime.strptime(check_in, '%Y-%m-%d')
-    check_out_date = datetime.strptime(check_out, '%Y-%m-%d')
-    num_nights = (check_out_date - check_in_date).days
-    return float(price_per_night) * num_nights, num_nights
+BOOKING_STATUSES = ('Pending', 'Confirmed', 'Cancelled', 'Completed')
+
+# Stays are half-open [check_in, check_out): checking out and checking in
+# on the same day does not conflict.
+CONFLICT_QUERY = """
+    SELECT COUNT(*) as conflict_count
+    FROM Booking
+    WHERE room_id = %s
+    AND status IN ('Pending', 'Confirmed')
+    AND check_in_date < %s
+    AND check_out_date > %s
+"""
+register_query('room_conflicts', CONFLICT_QUERY)
+register_query('lock_room', "SELECT Room_id FROM Room WHERE Room_id = %s FOR UPDATE")
+register_query('insert_booking', """
+    INSERT INTO Booking (Total_cost, status, check_in_date, check_out_date, user_id, room_id)
+    VALUES (%s, 'Pending', %s, %s, %s, %s)
+""")
+register_query('insert_payment', "INSERT INTO Payment (amount, booking_id) VALUES (%s, %s)")
+register_query('user_bookings', """
+    SELECT b.*, r.description as room_description, r.price, r.image_url,
+           l.city, l.area, p.amount as payment_amount
+    FROM Booking b
+    JOIN Room r ON b.room_id = r.Room_id
+    LEFT JOIN Location l ON r.Postal_code = l.Postal_code
+    LEFT JOIN Payment p ON b.booking_id = p.booking_id
+    WHERE b.user_id = %s
+    ORDER BY b.check_in_date DESC
+""")
+register_query('booking_details', """
+    SELECT b.*, r.description as room_description, r.price, r.image_url,
+           l.city, l.area, p.amount as payment_amount
+    FROM Booking b
+    JOIN Room r ON b.room_id = r.Room_id
+    LEFT JOIN Location l ON r.Postal_code = l.Postal_code
+    LEFT JOIN Payment p ON b.booking_id = p.booking_id
+    WHERE b.booking_id = %s
+""")
+register_query('update_booking_status', "UPDATE Booking SET status = %s WHERE booking_id = %s")
+
+def calculate_total_cost(price_per_night, check_in, check_out, room_id=None):
+    """Calculate total cost based on number of nights.
+
+    With room_id, the room's price rules (weekend, seasonal, ...) apply to
+    the nights they cover, exactly as in search result quotes.
+    """
+    totals, num_nights = quote_stays([{'Room_id': room_id, 'price': price_per_night}], check_in, check_out,
+                                     rules=None if room_id else [])
+    return float(totals[0]), num_nights
 
 def create_booking(user_id, room_id, check_in, check_out, price_per_night):
     """Create a new booking with payment."""
-    total_cost, num_nights = calculate_total_cost(price_per_night, check_in, check_out)
-    
-    # Create booking
-    booking_query = """
-        INSERT INTO Booking (Total_cost, status, check_in_date, check_out_date, user_id, room_id)
-        VALUES (%s, 'Pending', %s, %s, %s, %s)
-    """
-    
-    if execute_query(booking_query, (total_cost, check_in, check_out, user_id, room_id)):
-        # Get the last inserted booking_id
-        booking_id_result = execute_read_query("SELECT LAST_INSERT_ID() as booking_id")
-        if booking_id_result:
-            booking_id = booking_id_result[0]['booking_id']
-            
-            # Create payment record
-            payment_query = "INSERT INTO Payment (amount, booking_id) VALUES (%s, %s)"
-            execute_query(payment_query, (total_cost, booking_id))
-            
-            return True, f"Booking created! Total: {total_cost:.2f} TK for {num_nights} night(s)", booking_id
-    
-    return False, "Failed to create booking.", None
+    total_cost, num_nights = calculate_total_cost(price_per_night, check_in, check_out, room_id)
+
+    # Booking and payment are written together so neither can exist alone.
+    # Locking the Room row serializes bookings of that room only, so the
+    # availability check and the insert cannot interleave with another booking.
+    # The conflict count is the transaction's first consistent read, so its
+    # snapshot is taken after the lock and includes the previous holder's insert.
+    try:
+        with transaction() as tx:
+            if not tx.execute_named_read_query('lock_room', (room_id,)):
+                return False, "Room not found.", None
+            conflicts = tx.execute_named_read_query('room_conflicts', (room_id, check_out, check_in))
+            if conflicts[0]['conflict_count']:
+                return False, "Room is not available for selected dates", None
+            booking_id = tx.execute_named_query('insert_booking', (total_cost, check_in, check_out, user_id, room_id))
+            tx.execute_named_query('insert_payment', (total_cost, booking_id))
+            add_stay(tx, booking_id, room_id, check_in, check_out)
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False, "Failed to create booking.", None
+
+    availability_index.add(booking_id, room_id, check_in, check_out)
+    publish_ids('bookings', [booking_id])
+    return True, f"Booking created! Total: {total_cost:.2f} TK for {num_nights} night(s)", booking_id
 
 def get_user_bookings(user_id):
     """Get all bookings for a specific user."""
+    return execute_named_read_query('user_bookings', (user_id,))
+
+def get_all_bookings():
+    """Get all bookings (admin view)."""
     query = """
-        SELECT b.*, r.description as room_description, r.price, r.image_url,
-               l.city, l.area, p.amount as payment_amount
+        SELECT b.*, u.name as user_name, u.`e-mail` as user_email,
+               r.description as room_description, r.price,
+               l.city, l.area
         FROM Booking b
+        JOIN USER u ON b.user_id = u.user_id
         JOIN Room r ON b.room_id = r.Room_id
         LEFT JOIN Location l ON r.Postal_code = l.Postal_code
-        LEFT JOIN Payment p ON b.booking_id = p.booking_id
-        WHERE b.user_id = %s
         ORDER BY b.check_in_date DESC
     """
-    return execute_read_query(query, (user_id,))
+    return execute_read_query(query)
 
-def get_all_bookings():
-    """Get all bookings (admin view)."""
-    query = """
+def get_bookings_page(cursor=None, limit=50):
+    """Get one page of bookings (admin view), newest check-in first.
+
+    Keyset pagination on (check_in_date, booking_id): returns
+    (bookings, next_cursor) and next_cursor is None on the last page.
+    """
+    conditions, params = "", []
+    if cursor:
+        check_in_date, booking_id = cursor
+        conditions = "WHERE b.check_in_date < %s OR (b.check_in_date = %s AND b.booking_id < %s)"
+        params = [check_in_date, check_in_date, booking_id]
+    query = f"""
         SELECT b.*, u.name as user_name, u.`e-mail` as user_email,
                r.description as room_description, r.price,
                l.city, l.area
@@ -56,27 +119,63 @@ def get_all_bookings():
         JOIN USER u ON b.user_id = u.user_id
         JOIN Room r ON b.room_id = r.Room_id
         LEFT JOIN Location l ON r.Postal_code = l.Postal_code
-        ORDER BY b.check_in_date DESC
+        {conditions}
+        ORDER BY b.check_in_date DESC, b.booking_id DESC
+        LIMIT %s
     """
-    return execute_read_query(query)
+    bookings = execute_read_query(query, tuple(params + [limit + 1]))
+    if bookings is None:
+        return None, None
+    if len(bookings) <= limit:
+        return bookings, None
+    bookings = bookings[:limit]
+    last = bookings[-1]
+    return bookings, (last['check_in_date'], last['booking_id'])
 
 def update_booking_status(booking_id, new_status):
     """Update booking status (admin function)."""
-    query = "UPDATE Booking SET status = %s WHERE booking_id = %s"
-    if execute_query(query, (new_status, booking_id)):
-        return True, f"Booking status updated to {new_status}"
-    return False, "Failed to update booking status"
+    try:
+        with transaction() as tx:
+            tx.execute_named_query('update_booking_status', (new_status, booking_id))
+            sync_stays(tx, [booking_id], new_status)
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False, "Failed to update booking status"
+    refresh_booking(booking_id, new_status)
+    publish_ids('bookings', [booking_id])
+    return True, f"Booking status updated to {new_status}"
+
+def update_booking_statuses(booking_ids, new_status, batch_size=1000):
+    """Set the status of many bookings at once (admin function).
+
+    Issues one set-based UPDATE per batch_size ids, all in one transaction
+    together with the matching occupancy calendar changes.
+    """
+    if new_status not in BOOKING_STATUSES:
+        return False, f"Unknown booking status {new_status}"
+    booking_ids = list(dict.fromkeys(booking_ids))
+    if not booking_ids:
+        return False, "No bookings selected"
+
+    try:
+        with transaction() as tx:
+            for start in range(0, len(booking_ids), batch_size):
+                batch = booking_ids[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                tx.execute_query(
+                    f"UPDATE Booking SET status = %s WHERE booking_id IN ({placeholders})",
+                    (new_status, *batch),
+                )
+            sync_stays(tx, booking_ids, new_status)
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False, "Failed to update booking status"
+
+    refresh_bookings(booking_ids, new_status)
+    publish_ids('bookings', booking_ids)
+    return True, f"{len(booking_ids)} booking(s) updated to {new_status}"
 
 def get_booking_details(booking_id):
     """Get detailed information about a specific booking."""
-    query = """
-        SELECT b.*, r.description as room_description, r.price, r.image_url,
-               l.city, l.area, p.amount as payment_amount
-        FROM Booking b
-        JOIN Room r ON b.room_id = r.Room_id
-        LEFT JOIN Location l ON r.Postal_code = l.Postal_code
-        LEFT JOIN Payment p ON b.booking_id = p.booking_id
-        WHERE b.booking_id = %s
-    """
-    results = execute_read_query(query, (booking_id,))
+    results = execute_named_read_query('booking_details', (booking_id,))
     return results[0] if results else None
@@ -0,0 +1,86 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by every invalidation so loads that raced with it are dropped
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, generation=None):
+        """Store a value, unless the cache was invalidated since generation was read."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=_MISSING):
+        """Drop one key, or every entry when called without a key."""
+        with self._lock:
+            self.generation += 1
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+def read_through(cache):
+    """Cache a function's results in cache, keyed by (function name, *args).
+
+    None results (failed queries) are not cached. Cached values are shared
+    between callers and must be treated as read-only.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + args
+            value = cache.get(key)
+            if value is not _MISSING:
+                return value
+            generation = cache.generation
+            value = func(*args)
+            if value is not None:
+                cache.set(key, value, generation)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -1,16 +1,61 @@
+import contextvars
+import itertools
 import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
+from . import sqlite_engine
+from .pool import ConnectionPool
+from .metrics import caller, metrics, record_acquire, record_error, record_query, record_read
 
 load_dotenv()
 
-def create_connection():
-    """Create a database connection to the MySQL database."""
+_pool = None
+_pool_lock = threading.Lock()
+_replicas = None
+
+# Reads go to a replica unless they must see the primary's latest state:
+# the session wrote within DB_READ_YOUR_WRITES seconds, or the block runs
+# under primary_reads(). A replica that cannot open a connection is skipped
+# for REPLICA_RETRY_AFTER seconds.
+REPLICA_RETRY_AFTER = 30.0
+MAX_TRACKED_SESSIONS = 10000
+_session = contextvars.ContextVar('db_session', default=None)
+_primary_only = contextvars.ContextVar('db_primary_only', default=False)
+_last_writes = {}
+_writes_lock = threading.Lock()
+_replica_turn = itertools.count()
+_replica_down = {}
+
+def get_engine():
+    """The configured storage engine: 'mysql' (default) or 'sqlite'."""
+    return os.getenv('DB_ENGINE', 'mysql').lower()
+
+def sqlite_path():
+    return os.getenv('SQLITE_PATH') or f"{os.getenv('DB_NAME', 'airbnb_booking')}.db"
+
+def server_address(address=None):
+    """(host, port) of a 'host' or 'host:port' address, by default DB_HOST."""
+    host, _, port = (address or os.getenv('DB_HOST', 'localhost')).partition(':')
+    return host, int(port or 3306)
+
+def create_connection(address=None):
+    """Create a connection to the configured database.
+
+    address is 'host' or 'host:port' and defaults to DB_HOST (the primary).
+    """
+    if get_engine() == 'sqlite':
+        return create_sqlite_connection()
+    host, port = server_address(address)
     connection = None
     try:
         connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
+            host=host,
+            port=port,
             user=os.getenv('DB_USER', 'root'),
             password=os.getenv('DB_PASSWORD', ''),
             database=os.getenv('DB_NAME', 'airbnb_booking')
@@ -21,46 +66,456 @@ def create_connection():
         print(f"Error while connecting to MySQL: {e}")
     return connection
 
+def create_sqlite_connection():
+    """Open a connection to the embedded SQLite database file."""
+    try:
+        return sqlite_engine.connect(sqlite_path(), busy_timeout=float(os.getenv('SQLITE_BUSY_TIMEOUT', '5')))
+    except Error as e:
+        print(f"Error while opening SQLite database: {e}")
+        return None
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    create_connection,
+                    size=int(os.getenv('DB_POOL_SIZE', '5')),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                    max_uses=int(os.getenv('DB_POOL_MAX_USES', '1000')),
+                    ping_after=float(os.getenv('DB_POOL_PING_AFTER', '30')),
+                )
+    return _pool
+
+def replica_addresses():
+    """Read replicas from DB_REPLICA_HOSTS ('host[:port]', comma separated)."""
+    if get_engine() == 'sqlite':
+        # One file; WAL already lets reads run beside the writer
+        return []
+    return [address.strip() for address in os.getenv('DB_REPLICA_HOSTS', '').split(',') if address.strip()]
+
+def get_replica_pools():
+    """Return [(address, pool)] for the configured read replicas, creating them on first use."""
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                size = int(os.getenv('DB_REPLICA_POOL_SIZE', os.getenv('DB_POOL_SIZE', '5')))
+                _replicas = [
+                    (address, ConnectionPool(
+                        partial(create_connection, address),
+                        size=size,
+                        timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                        max_uses=int(os.getenv('DB_POOL_MAX_USES', '1000')),
+                        ping_after=float(os.getenv('DB_POOL_PING_AFTER', '30')),
+                    ))
+                    for address in replica_addresses()
+                ]
+    return _replicas
+
+def close_pool():
+    """Close all pooled connections (e.g. on application shutdown)."""
+    global _pool, _replicas
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+        for _, pool in _replicas or []:
+            pool.close_all()
+        _replicas = None
+
+def set_session(key):
+    """Tag this context's database calls with a session key (one browser)."""
+    _session.set(key)
+
+def read_your_writes_window():
+    return float(os.getenv('DB_READ_YOUR_WRITES', '5'))
+
+@contextmanager
+def primary_reads():
+    """Send the block's reads to the primary, e.g. to catch up on another process's write."""
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+def _session_key():
+    # Calls outside a browser session (scripts, background threads) get
+    # read-your-writes per thread
+    key = _session.get()
+    return key if key is not None else ('thread', threading.get_ident())
+
+def _record_write():
+    if not get_replica_pools():
+        return
+    now = time.monotonic()
+    with _writes_lock:
+        _last_writes[_session_key()] = now
+        if len(_last_writes) > MAX_TRACKED_SESSIONS:
+            window = read_your_writes_window()
+            for key, written in list(_last_writes.items()):
+                if now - written >= window:
+                    del _last_writes[key]
+
+def _needs_primary():
+    if _primary_only.get():
+        return True
+    written = _last_writes.get(_session_key())
+    return written is not None and time.monotonic() - written < read_your_writes_window()
+
+def _acquire_read():
+    """Check out a connection for a read; returns (pool, connection).
+
+    Tries the replicas in turn and falls back to the primary.
+    """
+    replicas = get_replica_pools()
+    if replicas and not _needs_primary():
+        for _ in replicas:
+            index = next(_replica_turn) % len(replicas)
+            address, pool = replicas[index]
+            if time.monotonic() - _replica_down.get(index, -REPLICA_RETRY_AFTER) < REPLICA_RETRY_AFTER:
+                continue
+            try:
+                connection = _acquire(pool)
+            except Error as e:
+                # Every connection busy: try the next replica
+                print(f"The error '{e}' occurred on replica {address}")
+                continue
+            if connection:
+                record_read('replica')
+                return pool, connection
+            _replica_down[index] = time.monotonic()
+    pool = get_pool()
+    connection = _acquire(pool)
+    record_read('primary')
+    return pool, connection
+
+def _acquire(pool):
+    """Check out a pooled connection, recording how long the wait took."""
+    started = time.perf_counter()
+    try:
+        return pool.acquire()
+    finally:
+        record_acquire(time.perf_counter() - started)
+
+# Hot statements are registered once by name. Each pooled connection
+# prepares a named statement on first use (server-side with MySQL) and
+# re-executes it afterwards, so it is parsed once per connection rather
+# than on every call.
+_named_queries = {}
+_query_stats = {}
+_stats_lock = threading.Lock()
+
+def prepared_statements_enabled():
+    return os.getenv('DB_PREPARED_STATEMENTS', '1') == '1'
+
+def register_query(name, query):
+    """Register a statement under name for the execute_named_* functions."""
+    if _named_queries.get(name, query) != query:
+        raise ValueError(f"A different query is already registered as '{name}'")
+    _named_queries[name] = query
+
+def get_named_query(name):
+    return _named_queries[name]
+
+def query_stats():
+    """Per named query: calls, prepares, errors, rows, total and mean milliseconds."""
+    with _stats_lock:
+        stats = {name: dict(entry) for name, entry in _query_stats.items()}
+    for entry in stats.values():
+        entry['total_ms'] = round(entry.pop('seconds') * 1000, 3)
+        entry['mean_ms'] = round(entry['total_ms'] / entry['calls'], 3) if entry['calls'] else None
+    return stats
+
+def reset_query_stats():
+    with _stats_lock:
+        _query_stats.clear()
+
+def _record_named(name, prepared, seconds=None, rows=0):
+    with _stats_lock:
+        entry = _query_stats.get(name)
+        if entry is None:
+            entry = _query_stats[name] = {'calls': 0, 'prepares': 0, 'errors': 0, 'rows': 0, 'seconds': 0.0}
+        entry['calls'] += 1
+        entry['prepares'] += prepared
+        if seconds is None:
+            entry['errors'] += 1
+        else:
+            entry['rows'] += max(rows, 0)
+            entry['seconds'] += seconds
+    labels = (('query', name),)
+    metrics.inc('roomify_db_named_query_calls_total', labels)
+    if prepared:
+        metrics.inc('roomify_db_statement_prepares_total', labels)
+
+def _execute_named(connection, statements, name, params, read, function):
+    """Run a registered statement on the connection's cursor for it.
+
+    Returns (rows for reads or rowcount for writes, lastrowid).
+    """
+    query = _named_queries[name]
+    cursor = statements.get(name)
+    prepared = cursor is None
+    if prepared:
+        cursor = statements[name] = connection.cursor(prepared=True, dictionary=read)
+    started = time.perf_counter()
+    try:
+        cursor.execute(query, params or ())
+        result = cursor.fetchall() if read else cursor.rowcount
+    except Error:
+        # Do not reuse a cursor whose statement just failed
+        statements.pop(name, None)
+        try:
+            cursor.close()
+        except Error:
+            pass
+        _record_named(name, prepared)
+        record_error(function)
+        raise
+    seconds = time.perf_counter() - started
+    rows = len(result) if read else result
+    _record_named(name, prepared, seconds, rows)
+    record_query(function, query, seconds, rows)
+    return result, cursor.lastrowid
+
+def execute_named_query(name, params=None):
+    """Execute a registered write statement; returns True on success like execute_query."""
+    if not prepared_statements_enabled():
+        return execute_query(_named_queries[name], params)
+    function = caller(__file__)
+    pool = get_pool()
+    try:
+        connection = _acquire(pool)
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        record_error(function)
+        return False
+    if not connection:
+        return False
+    try:
+        _execute_named(connection, pool.statements(connection), name, params, False, function)
+        connection.commit()
+        _record_write()
+        return True
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False
+    finally:
+        pool.release(connection)
+
+def execute_named_read_query(name, params=None):
+    """Execute a registered SELECT and return its rows like execute_read_query."""
+    if not prepared_statements_enabled():
+        return execute_read_query(_named_queries[name], params)
+    function = caller(__file__)
+    try:
+        pool, connection = _acquire_read()
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        record_error(function)
+        return None
+    if not connection:
+        return None
+    try:
+        return _execute_named(connection, pool.statements(connection), name, params, True, function)[0]
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return None
+    finally:
+        pool.release(connection)
+
 def execute_query(query, params=None):
     """Execute a query (INSERT, UPDATE, DELETE)."""
-    connection = create_connection()
+    function = caller(__file__)
+    pool = get_pool()
+    try:
+        connection = _acquire(pool)
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        record_error(function)
+        return False
     if connection:
         try:
             cursor = connection.cursor()
-            if params:
-                print(f"DEBUG: Executing query: {query} with params: {params}")
-                cursor.execute(query, params)
-            else:
-                print(f"DEBUG: Executing query: {query}")
-                cursor.execute(query)
-            connection.commit()
-            return True
+            try:
+                started = time.perf_counter()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                connection.commit()
+                record_query(function, query, time.perf_counter() - started, cursor.rowcount)
+                _record_write()
+                return True
+            finally:
+                cursor.close()
         except Error as e:
             print(f"The error '{e}' occurred")
+            record_error(function)
             return False
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            pool.release(connection)
     return False
 
 def execute_read_query(query, params=None):
     """Execute a read query (SELECT) and return results."""
-    connection = create_connection()
+    function = caller(__file__)
+    try:
+        pool, connection = _acquire_read()
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        record_error(function)
+        return None
     result = None
     if connection:
         try:
             cursor = connection.cursor(dictionary=True) # Return results as dictionaries
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            result = cursor.fetchall()
-            return result
+            try:
+                started = time.perf_counter()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                result = cursor.fetchall()
+                record_query(function, query, time.perf_counter() - started, len(result))
+                return result
+            finally:
+                cursor.close()
         except Error as e:
             print(f"The error '{e}' occurred")
+            record_error(function)
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            pool.release(connection)
     return result
+
+def stream_read_query(query, params=None, chunk_size=1000):
+    """Yield rows of a SELECT one at a time without loading the result set.
+
+    Uses an unbuffered cursor, so MySQL streams rows to the client as they
+    are fetched in chunk_size batches. The pooled connection is held until
+    the generator is exhausted or closed.
+    """
+    function = caller(__file__)
+    pool, connection = _acquire_read()
+    if not connection:
+        raise Error("Could not connect to the database")
+    finished = False
+    count = 0
+    try:
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            # Timed from execute to the last fetch, including the consumer's pace
+            started = time.perf_counter()
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+            finished = True
+            record_query(function, query, time.perf_counter() - started, count)
+        finally:
+            if finished:
+                cursor.close()
+    finally:
+        # A partly read result set leaves the connection unusable; drop it
+        pool.release(connection, discard=not finished)
+
+class Transaction:
+    """A unit of work: statements run on one connection and commit together."""
+
+    def __init__(self, connection, statements=None):
+        self.connection = connection
+        self.statements = {} if statements is None else statements
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def execute_query(self, query, params=None):
+        """Execute a write statement and return the generated id (if any)."""
+        cursor = self.connection.cursor()
+        try:
+            started = time.perf_counter()
+            self._execute(cursor.execute, query, params or ())
+            self.lastrowid = cursor.lastrowid
+            self.rowcount = cursor.rowcount
+            record_query(caller(__file__), query, time.perf_counter() - started, self.rowcount)
+            return self.lastrowid
+        finally:
+            cursor.close()
+
+    def execute_many(self, query, seq_params):
+        """Execute a write statement for every parameter tuple in one batch."""
+        cursor = self.connection.cursor()
+        try:
+            started = time.perf_counter()
+            self._execute(cursor.executemany, query, seq_params)
+            self.lastrowid = cursor.lastrowid
+            self.rowcount = cursor.rowcount
+            record_query(caller(__file__), query, time.perf_counter() - started, self.rowcount)
+            return self.rowcount
+        finally:
+            cursor.close()
+
+    def execute_read_query(self, query, params=None):
+        """Execute a SELECT inside the transaction and return dict rows."""
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            started = time.perf_counter()
+            self._execute(cursor.execute, query, params or ())
+            rows = cursor.fetchall()
+            record_query(caller(__file__), query, time.perf_counter() - started, len(rows))
+            return rows
+        finally:
+            cursor.close()
+
+    def execute_named_query(self, name, params=None):
+        """Execute a registered write statement and return the generated id (if any)."""
+        if not prepared_statements_enabled():
+            return self.execute_query(_named_queries[name], params)
+        self.rowcount, self.lastrowid = _execute_named(
+            self.connection, self.statements, name, params, False, caller(__file__))
+        return self.lastrowid
+
+    def execute_named_read_query(self, name, params=None):
+        """Execute a registered SELECT inside the transaction and return dict rows."""
+        if not prepared_statements_enabled():
+            return self.execute_read_query(_named_queries[name], params)
+        return _execute_named(self.connection, self.statements, name, params, True, caller(__file__))[0]
+
+    @staticmethod
+    def _execute(method, query, params):
+        try:
+            method(query, params)
+        except Error:
+            record_error(caller(__file__))
+            raise
+
+@contextmanager
+def transaction():
+    """Run a block of statements atomically on a single pooled connection.
+
+    Commits when the block exits normally and rolls back (re-raising) if
+    it raises. Database errors surface as mysql.connector.Error.
+    """
+    pool = get_pool()
+    connection = _acquire(pool)
+    if not connection:
+        raise Error("Could not connect to the database")
+    try:
+        yield Transaction(connection, pool.statements(connection))
+        connection.commit()
+        _record_write()
+    except BaseException:
+        try:
+            connection.rollback()
+        except Error:
+            pool.release(connection, discard=True)
+            connection = None
+        raise
+    finally:
+        if connection:
+            pool.release(connection)
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from .database import stream_read_query
+
+EXPORT_COLUMNS = [
+    'booking_id', 'status', 'check_in_date', 'check_out_date', 'Total_cost', 'payment_amount',
+    'user_id', 'user_name', 'user_email', 'room_id', 'city', 'area',
+]
+
+BOOKINGS_EXPORT_QUERY = """
+    SELECT b.booking_id, b.status, b.check_in_date, b.check_out_date, b.Total_cost,
+           p.amount as payment_amount, b.user_id, u.name as user_name, u.`e-mail` as user_email,
+           b.room_id, l.city, l.area
+    FROM Booking b
+    JOIN USER u ON b.user_id = u.user_id
+    JOIN Room r ON b.room_id = r.Room_id
+    LEFT JOIN Location l ON r.Postal_code = l.Postal_code
+    LEFT JOIN Payment p ON b.booking_id = p.booking_id
+    ORDER BY b.booking_id
+"""
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def export_bookings_csv(chunk_size=1000):
+    """Yield the full booking history as CSV text, chunk_size rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for batch in _batches(stream_read_query(BOOKINGS_EXPORT_QUERY, chunk_size=chunk_size), chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_bookings_ndjson(chunk_size=1000):
+    """Yield the full booking history as newline-delimited JSON, chunk_size rows at a time."""
+    for batch in _batches(stream_read_query(BOOKINGS_EXPORT_QUERY, chunk_size=chunk_size), chunk_size):
+        # Dates and DECIMAL amounts are written as strings
+        yield ''.join(json.dumps(row, default=str) + '\n' for row in batch)
+
+EXPORT_FORMATS = {
+    'csv': (export_bookings_csv, 'text/csv'),
+    'ndjson': (export_bookings_ndjson, 'application/x-ndjson'),
+}
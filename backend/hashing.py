@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+
+
+class HashingBusyError(Exception):
+    """Raised when too many hashing jobs are already waiting."""
+
+
+def hash_password(password):
+    """Hash a password for storing."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def verify_password(stored_password, provided_password):
+    """Verify a stored password against one provided by user."""
+    return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password.encode('utf-8'))
+
+
+class HashingService:
+    """Runs bcrypt on a process pool so password checks use every core
+    and never block the event loop.
+
+    At most max_pending jobs may be queued or running; further calls fail
+    fast with HashingBusyError instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers=None, max_pending=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def hash_password(self, password):
+        """Hash a password for storing."""
+        return await self._submit(hash_password, password)
+
+    async def verify_password(self, stored_password, provided_password):
+        """Verify a stored password against one provided by user."""
+        return await self._submit(verify_password, stored_password, provided_password)
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingBusyError(f"{self._pending} hashing jobs already pending")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_hashing_service():
+    """Return the shared hashing service, configured from HASH_* env vars."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                workers = os.getenv('HASH_WORKERS')
+                _service = HashingService(
+                    workers=int(workers) if workers else None,
+                    max_pending=int(os.getenv('HASH_MAX_PENDING', '64')),
+                )
+    return _service
@@ -0,0 +1,169 @@
+"""Content-addressed room image store with resized variants.
+
+A room's image_url is fetched once, stored under the SHA-256 of its bytes
+and resized into VARIANTS on a background process pool. Pages link the
+small variant files, which never change for a given key and can be cached
+by browsers indefinitely, instead of the full-size original.
+
+Backfill rooms created before the pipeline (or by bulk import) with:
+
+    python -m backend.images
+"""
+import hashlib
+import os
+import threading
+import urllib.request
+from concurrent.futures import Future, ProcessPoolExecutor
+from PIL import Image, ImageOps, features
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Longest side in pixels; cards are 320px wide, the details page up to ~900px
+VARIANTS = {'thumb': 640, 'detail': 1600}
+QUALITY = {'webp': 75, 'avif': 55}
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT = 15
+
+
+def store_dir():
+    return os.getenv('IMAGE_STORE', os.path.join(ROOT_DIR, 'media'))
+
+def image_format():
+    """Variant format from IMAGE_FORMAT; AVIF falls back to WebP without encoder support."""
+    fmt = os.getenv('IMAGE_FORMAT', 'webp').lower()
+    if fmt == 'avif' and not features.check('avif'):
+        return 'webp'
+    return fmt if fmt in QUALITY else 'webp'
+
+def variant_name(variant, fmt=None):
+    return f"{variant}.{fmt or image_format()}"
+
+def variant_url(image_key, variant):
+    """URL of a stored variant, as served under /images by the frontend."""
+    return f"/images/{image_key[:2]}/{image_key}/{variant_name(variant)}"
+
+def can_ingest(image_url):
+    # Only remote images are fetched; anything else is left to the browser
+    return bool(image_url) and image_url.lower().startswith(('http://', 'https://'))
+
+
+def read_source(image_url):
+    request = urllib.request.Request(image_url, headers={'User-Agent': 'Roomify image pipeline'})
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_SOURCE_BYTES + 1)
+    except OSError as e:
+        # HTTPError holds the open response and cannot be sent back from a worker
+        raise ValueError(f"Could not fetch {image_url}: {e}") from None
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"Image larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+def ingest(image_url, store, fmt):
+    """Fetch an image and write its variants; returns its content key.
+
+    Runs in a worker process. Files are written under temporary names and
+    renamed into place, so a reader never sees a half-written variant.
+    """
+    data = read_source(image_url)
+    key = hashlib.sha256(data).hexdigest()
+    directory = os.path.join(store, key[:2], key)
+    wanted = [(variant, size) for variant, size in VARIANTS.items()
+              if not os.path.exists(os.path.join(directory, variant_name(variant, fmt)))]
+    if not wanted:
+        return key
+
+    os.makedirs(directory, exist_ok=True)
+    original = os.path.join(directory, 'original')
+    if not os.path.exists(original):
+        _write(original, lambda path: _write_bytes(path, data))
+
+    with Image.open(original) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for variant, size in wanted:
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            _write(os.path.join(directory, variant_name(variant, fmt)),
+                   lambda path: resized.save(path, format=fmt.upper(), quality=QUALITY[fmt]))
+    return key
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def _write(path, writer):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+class ImagePipeline:
+    """Runs image ingestion on a small process pool, off the request path.
+
+    on_done(key) is called from a pool thread when an image is ready;
+    failures are printed and leave the room on its original URL.
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, image_url, on_done):
+        """Queue an image; the returned future resolves to its key once on_done has run."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(ingest, image_url, store_dir(), image_format())
+        done = Future()
+
+        def finished(future):
+            try:
+                key = future.result()
+                on_done(key)
+            except Exception as e:
+                print(f"The error '{e}' occurred while processing image {image_url}")
+                done.set_exception(e)
+            else:
+                done.set_result(key)
+
+        future.add_done_callback(finished)
+        return done
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_image_pipeline():
+    """Return the shared pipeline, or None when IMAGE_PIPELINE is disabled."""
+    global _pipeline
+    if os.getenv('IMAGE_PIPELINE', '1') != '1':
+        return None
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = ImagePipeline(workers=int(os.getenv('IMAGE_WORKERS', '2')))
+    return _pipeline
+
+
+if __name__ == '__main__':
+    from .rooms import ingest_missing_images
+    futures = ingest_missing_images()
+    failed = 0
+    for future in futures:
+        try:
+            future.result()
+        except Exception:
+            failed += 1  # Already reported by the pipeline
+    print(f"Processed {len(futures) - failed} room image(s), {failed} failed")
@@ -0,0 +1,112 @@
+"""Cross-process invalidation bus for the in-process caches and indexes.
+
+With several app workers (WEB_WORKERS > 1) every process keeps its own room
+cache, availability index and search index. A write in one worker is
+published as a small datagram to the Unix socket of every other worker in
+INVALIDATION_DIR, whose subscribed handlers drop or reload the affected
+entries. Messages are never delivered back to the publishing process: its
+write path has already updated its own state.
+
+Without INVALIDATION_DIR (a single process) publish does nothing.
+"""
+import json
+import os
+import socket
+import threading
+from .database import primary_reads
+
+# Keeps a message well below the default Unix datagram size limit
+MAX_IDS_PER_MESSAGE = 1000
+SEND_TIMEOUT = 1.0
+
+_handlers = {}
+_socket = None
+_receiver = None
+_path = None
+_lock = threading.Lock()
+
+
+def bus_dir():
+    return os.getenv('INVALIDATION_DIR')
+
+def subscribe(topic, handler):
+    """Call handler(*args) when another worker publishes topic."""
+    _handlers.setdefault(topic, []).append(handler)
+
+def publish(topic, *args):
+    """Send topic to every other worker; a no-op when the bus is not running."""
+    if _socket is None:
+        return
+    payload = json.dumps([topic, args], default=str).encode()
+    directory = bus_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError as e:
+        print(f"The error '{e}' occurred")
+        return
+    for name in names:
+        path = os.path.join(directory, name)
+        if path == _path or not name.endswith('.sock'):
+            continue
+        try:
+            with _lock:
+                _socket.sendto(payload, path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # The worker behind it has exited; it re-registers when restarted
+            _remove(path)
+        except OSError as e:
+            print(f"The error '{e}' occurred while notifying {name}")
+
+def publish_ids(topic, ids):
+    """Publish topic with a list of ids, split over as many messages as needed."""
+    ids = list(ids)
+    for start in range(0, len(ids), MAX_IDS_PER_MESSAGE):
+        publish(topic, ids[start:start + MAX_IDS_PER_MESSAGE])
+
+def start_bus():
+    """Join the bus in INVALIDATION_DIR (called once per worker at startup)."""
+    global _socket, _receiver, _path
+    directory = bus_dir()
+    if not directory or _socket is not None:
+        return False
+    os.makedirs(directory, exist_ok=True)
+    _path = os.path.join(directory, f"{os.getpid()}.sock")
+    _remove(_path)
+    receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    receiver.bind(_path)
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.settimeout(SEND_TIMEOUT)
+    _socket, _receiver = sender, receiver
+    threading.Thread(target=_listen, args=(receiver,), name='invalidation-bus', daemon=True).start()
+    return True
+
+def stop_bus():
+    global _socket, _receiver
+    if _socket is not None:
+        _socket.close()
+        _receiver.close()
+        _socket = _receiver = None
+        _remove(_path)
+
+def _listen(receiver):
+    while True:
+        try:
+            topic, args = json.loads(receiver.recv(65536))
+        except OSError:
+            return
+        except ValueError as e:
+            print(f"The error '{e}' occurred")
+            continue
+        for handler in _handlers.get(topic, ()):
+            try:
+                # The write just happened elsewhere; replicas may not have it yet
+                with primary_reads():
+                    handler(*args)
+            except Exception as e:
+                print(f"The error '{e}' occurred while handling {topic}")
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,128 @@
+"""Booking lifecycle transitions, run in the background.
+
+Bookings only leave the active set (Pending/Confirmed) when something
+moves them, so without this the availability queries keep scanning stays
+that ended long ago. Every BOOKING_SCHEDULER_INTERVAL seconds a sweep:
+
+- completes Confirmed stays whose check-out date has passed,
+- cancels Pending stays that ended without ever being confirmed.
+
+Each transition is set-based: up to BATCH_SIZE matching bookings are
+locked, updated with one statement and removed from the occupancy
+calendar in a short transaction, then dropped from the availability
+index and announced to the other workers.
+
+Run one sweep by hand (e.g. from cron when the scheduler is disabled) with:
+
+    python -m backend.lifecycle
+"""
+import os
+import threading
+from datetime import datetime
+from mysql.connector import Error
+from .availability import refresh_bookings
+from .database import transaction
+from .invalidation import publish_ids
+from .metrics import metrics
+from .occupancy import sync_stays
+
+BATCH_SIZE = 1000
+
+def due_transitions(now):
+    """(new status, condition on Booking b, parameters) for every transition due at now."""
+    today = now.date()
+    return [
+        ('Completed', "b.status = 'Confirmed' AND b.check_out_date < %s", (today,)),
+        ('Cancelled', "b.status = 'Pending' AND b.check_out_date < %s", (today,)),
+    ]
+
+def run_transitions(now=None, batch_size=BATCH_SIZE):
+    """Apply every due transition in batches; returns {new status: bookings moved}."""
+    now = now or datetime.now()
+    moved = {}
+    for status, condition, params in due_transitions(now):
+        while True:
+            try:
+                booking_ids = _transition_batch(status, condition, params, batch_size)
+            except Error as e:
+                print(f"The error '{e}' occurred")
+                return moved
+            moved[status] = moved.get(status, 0) + len(booking_ids)
+            if len(booking_ids) < batch_size:
+                break
+    return moved
+
+def _transition_batch(status, condition, params, batch_size):
+    with transaction() as tx:
+        # Locked so an admin changing one of them meanwhile waits for this batch
+        rows = tx.execute_read_query(
+            f"SELECT b.booking_id FROM Booking b WHERE {condition} ORDER BY b.booking_id LIMIT %s FOR UPDATE",
+            params + (batch_size,),
+        )
+        booking_ids = [row['booking_id'] for row in rows]
+        if booking_ids:
+            placeholders = ', '.join(['%s'] * len(booking_ids))
+            tx.execute_query(
+                f"UPDATE Booking SET status = %s WHERE booking_id IN ({placeholders})",
+                (status, *booking_ids),
+            )
+            sync_stays(tx, booking_ids, status)
+    if booking_ids:
+        refresh_bookings(booking_ids, status)
+        publish_ids('bookings', booking_ids)
+        metrics.inc('roomify_booking_transitions_total', (('status', status),), len(booking_ids))
+    return booking_ids
+
+
+class LifecycleScheduler:
+    """Runs run_transitions on a daemon thread: once at start, then every interval seconds."""
+
+    def __init__(self, interval=300.0):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='booking-lifecycle', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                moved = run_transitions()
+                if any(moved.values()):
+                    print(f"Booking lifecycle: {moved}")
+            except Exception as e:
+                print(f"The error '{e}' occurred in the booking lifecycle sweep")
+            if self._stop.wait(self.interval):
+                return
+
+
+_scheduler = None
+
+def start_scheduler():
+    """Start the background sweeps unless BOOKING_SCHEDULER is 0 (called at startup)."""
+    global _scheduler
+    if os.getenv('BOOKING_SCHEDULER', '1') != '1' or _scheduler is not None:
+        return False
+    _scheduler = LifecycleScheduler(interval=float(os.getenv('BOOKING_SCHEDULER_INTERVAL', '300')))
+    _scheduler.start()
+    return True
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+
+
+if __name__ == '__main__':
+    print(f"Bookings moved: {run_transitions()}")
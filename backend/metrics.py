@@ -0,0 +1,198 @@
+import os
+import re
+import sys
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'IN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_fingerprints = {}
+
+
+def fingerprint(query):
+    """Normalise a query so statements differing only in values group together.
+
+    Literals and placeholders become ?, IN lists collapse to IN (...) and
+    whitespace is squeezed. Parameters are never part of a fingerprint.
+    """
+    result = _fingerprints.get(query)
+    if result is None:
+        result = _STRING.sub('?', query)
+        result = _NUMBER.sub('?', result)
+        result = _PLACEHOLDER.sub('?', result)
+        result = _IN_LIST.sub('IN (...)', result)
+        result = _WHITESPACE.sub(' ', result).strip()
+        # Generated IN lists make many distinct strings; keep the memo bounded
+        if len(_fingerprints) < 4096:
+            _fingerprints[query] = result
+    return result
+
+
+def caller(skip_file):
+    """module.function of the nearest stack frame outside skip_file."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == skip_file:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    module = frame.f_globals.get('__name__', '?').rsplit('.', 1)[-1]
+    return f"{module}.{frame.f_code.co_name}"
+
+
+class Histogram:
+    """Cumulative latency histogram for one label set."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Metrics:
+    """Thread-safe registry of counters and histograms keyed by label tuples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def observe(self, name, labels, seconds):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def total(self, name):
+        """Sum of a counter over all its label sets."""
+        with self._lock:
+            return sum(value for (counter, _), value in self._counters.items() if counter == name)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, extra=()):
+        """Prometheus text exposition of everything recorded so far.
+
+        extra is an iterable of (name, labels, value) gauges appended as-is.
+        """
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.total) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        described = set()
+
+        def header(name, default_kind):
+            if name not in described:
+                described.add(name)
+                kind, text = self._help.get(name, (default_kind, ''))
+                if text:
+                    lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (counts, count, total) in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, counts):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for name, labels, value in extra:
+            header(name, 'gauge')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **more):
+    pairs = list(labels) + [(key, value) for key, value in more.items()]
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+metrics = Metrics()
+metrics.describe('roomify_db_query_seconds', 'histogram', 'Time spent executing SQL, by calling backend function.')
+metrics.describe('roomify_db_acquire_seconds', 'histogram', 'Time spent waiting for a pooled connection.')
+metrics.describe('roomify_db_rows_total', 'counter', 'Rows returned or affected, by calling backend function.')
+metrics.describe('roomify_db_errors_total', 'counter', 'Failed statements, by calling backend function.')
+metrics.describe('roomify_db_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS.')
+metrics.describe('roomify_db_named_query_calls_total', 'counter', 'Executions of registered (prepared) statements, by query name.')
+metrics.describe('roomify_db_statement_prepares_total', 'counter', 'Times a registered statement was prepared on a connection.')
+metrics.describe('roomify_db_reads_total', 'counter', 'Read statements, by target (primary or replica).')
+metrics.describe('roomify_booking_transitions_total', 'counter', 'Bookings moved by the lifecycle scheduler, by new status.')
+metrics.describe('roomify_backend_call_seconds', 'histogram', 'Wall time of backend calls made from the UI, including queueing.')
+
+_slow_log_lock = threading.Lock()
+
+
+def slow_query_threshold():
+    """Seconds above which a statement is logged; SLOW_QUERY_MS=0 disables the log."""
+    return float(os.getenv('SLOW_QUERY_MS', '200')) / 1000
+
+
+def log_slow_query(function, query, seconds, rows):
+    """Write one slow-query line (fingerprint only, no parameters)."""
+    metrics.inc('roomify_db_slow_queries_total', (('function', function),))
+    line = (f"{time.strftime('%Y-%m-%d %H:%M:%S')} slow query {seconds * 1000:.1f} ms "
+            f"rows={rows} function={function} query={fingerprint(query)}")
+    path = os.getenv('SLOW_QUERY_LOG')
+    if not path:
+        print(line)
+        return
+    with _slow_log_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def record_query(function, query, seconds, rows):
+    labels = (('function', function),)
+    metrics.observe('roomify_db_query_seconds', labels, seconds)
+    if rows and rows > 0:
+        metrics.inc('roomify_db_rows_total', labels, rows)
+    threshold = slow_query_threshold()
+    if threshold and seconds >= threshold:
+        log_slow_query(function, query, seconds, rows)
+
+
+def record_error(function):
+    metrics.inc('roomify_db_errors_total', (('function', function),))
+
+
+def record_read(target):
+    metrics.inc('roomify_db_reads_total', (('target', target),))
+
+
+def record_acquire(seconds):
+    metrics.observe('roomify_db_acquire_seconds', (), seconds)
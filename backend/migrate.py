@@ -0,0 +1,100 @@
+"""Apply versioned schema migrations from the migrations/ directory.
+
+Run after importing db.sql (with DB_ENGINE=sqlite, db.sql is loaded
+into a new database file first):
+
+    python -m backend.migrate
+"""
+import os
+import re
+from mysql.connector import Error
+from .database import execute_query, execute_read_query, get_engine, transaction
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(ROOT_DIR, 'migrations')
+SCHEMA_FILE = os.path.join(ROOT_DIR, 'db.sql')
+
+# MySQL commits each DDL statement on its own, so a migration that fails
+# halfway leaves its earlier statements in place. On the next run those
+# statements fail with one of these errors and are skipped:
+# table exists, duplicate column name, duplicate key name.
+ALREADY_APPLIED_ERRORS = {1050, 1060, 1061}
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return (version, name, path) for every NNN_name.sql file, in order."""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = re.match(r'^(\d+)_(\w+)\.sql$', filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+def split_statements(sql):
+    """Split a migration file into statements, dropping '--' comments."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def load_schema(path=SCHEMA_FILE):
+    """Run db.sql against the configured database, minus its CREATE DATABASE/USE."""
+    with open(path, encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    with transaction() as tx:
+        for statement in statements:
+            if statement.upper().startswith(('CREATE DATABASE', 'USE ')):
+                continue
+            tx.execute_query(statement)
+
+def ensure_schema():
+    """Create the base tables in an empty SQLite database; returns True if it did."""
+    if get_engine() != 'sqlite':
+        return False
+    rows = execute_read_query("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'Room'")
+    if rows is None:
+        raise Error("Could not read the SQLite schema")
+    if rows:
+        return False
+    load_schema()
+    print("Created schema from db.sql")
+    return True
+
+def applied_versions():
+    execute_query("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = execute_read_query("SELECT version FROM schema_migrations")
+    if rows is None:
+        raise Error("Could not read schema_migrations")
+    return {row['version'] for row in rows}
+
+def migrate(directory=MIGRATIONS_DIR):
+    """Apply pending migrations in version order; return the versions applied."""
+    ensure_schema()
+    done = applied_versions()
+    applied = []
+    for version, name, path in discover_migrations(directory):
+        if version in done:
+            continue
+        with open(path, encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        # The version row is written last, so a failed migration is run
+        # again on the next run; statements it already applied are skipped
+        with transaction() as tx:
+            for statement in statements:
+                try:
+                    tx.execute_query(statement)
+                except Error as e:
+                    if e.errno not in ALREADY_APPLIED_ERRORS:
+                        raise
+                    print(f"Skipping statement of {version:03d}_{name} that is already applied: {e.msg}")
+            tx.execute_query("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        print(f"Applied migration {version:03d}_{name}")
+        applied.append(version)
+    return applied
+
+if __name__ == '__main__':
+    if not migrate():
+        print("Database schema is up to date")
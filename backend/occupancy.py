@@ -0,0 +1,104 @@
+"""Per-room, per-night occupancy calendar (the RoomNight table).
+
+Every night of a Pending or Confirmed stay has one row, written in the
+same transaction as the booking change that causes it. "Which nights of
+this room are taken" is then one primary-key range scan instead of a
+conflict query per date range.
+
+Copy existing bookings into the calendar (e.g. after migration 004) with:
+
+    python -m backend.occupancy
+"""
+from datetime import date, timedelta
+from mysql.connector import Error
+from .availability import ACTIVE_STATUSES, to_date
+from .database import execute_named_read_query, execute_read_query, register_query, transaction
+
+# How far ahead the booking form's calendar looks
+CALENDAR_DAYS = 365
+INSERT_BATCH = 1000
+
+INSERT_NIGHTS = "INSERT INTO RoomNight (room_id, night, booking_id) VALUES (%s, %s, %s)"
+# Legacy overlapping stays, or a cancelled stay made active again, may
+# claim a night that is already taken; the earlier claim keeps it
+INSERT_NIGHTS_IF_FREE = INSERT_NIGHTS + " ON DUPLICATE KEY UPDATE room_id = room_id"
+
+register_query('room_nights', """
+    SELECT night FROM RoomNight
+    WHERE room_id = %s AND night >= %s AND night < %s
+    ORDER BY night
+""")
+
+def stay_nights(check_in, check_out):
+    """Nights of the half-open stay [check_in, check_out)."""
+    check_in, check_out = to_date(check_in), to_date(check_out)
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+def add_stay(tx, booking_id, room_id, check_in, check_out):
+    """Claim the nights of a new stay; raises IntegrityError if one is taken."""
+    rows = [(room_id, night, booking_id) for night in stay_nights(check_in, check_out)]
+    if rows:
+        tx.execute_many(INSERT_NIGHTS, rows)
+
+def _add_stays(tx, bookings):
+    rows = [(booking['room_id'], night, booking['booking_id'])
+            for booking in bookings
+            for night in stay_nights(booking['check_in_date'], booking['check_out_date'])]
+    for start in range(0, len(rows), INSERT_BATCH):
+        tx.execute_many(INSERT_NIGHTS_IF_FREE, rows[start:start + INSERT_BATCH])
+    return len(rows)
+
+def sync_stays(tx, booking_ids, status):
+    """Bring the calendar in line after the bookings all moved to status."""
+    for start in range(0, len(booking_ids), INSERT_BATCH):
+        batch = booking_ids[start:start + INSERT_BATCH]
+        placeholders = ', '.join(['%s'] * len(batch))
+        if status not in ACTIVE_STATUSES:
+            tx.execute_query(f"DELETE FROM RoomNight WHERE booking_id IN ({placeholders})", tuple(batch))
+            continue
+        bookings = tx.execute_read_query(
+            f"SELECT booking_id, room_id, check_in_date, check_out_date FROM Booking WHERE booking_id IN ({placeholders})",
+            tuple(batch),
+        )
+        _add_stays(tx, bookings)
+
+def booked_nights(room_id, start=None, days=CALENDAR_DAYS):
+    """Taken nights of a room from start (default today) for the given number of days."""
+    start = to_date(start) if start else date.today()
+    rows = execute_named_read_query('room_nights', (room_id, start, start + timedelta(days=days)))
+    if rows is None:
+        return None
+    return [to_date(row['night']) for row in rows]
+
+def rebuild_calendar():
+    """Recreate the calendar from current and upcoming active bookings; returns the nights written."""
+    with transaction() as tx:
+        tx.execute_query("DELETE FROM RoomNight")
+        bookings = tx.execute_read_query("""
+            SELECT booking_id, room_id, check_in_date, check_out_date
+            FROM Booking
+            WHERE status IN ('Pending', 'Confirmed')
+            AND check_out_date >= CURDATE()
+        """)
+        return _add_stays(tx, bookings)
+
+def ensure_occupancy_calendar():
+    """Fill an empty calendar from the bookings table (called once at startup)."""
+    calendar = execute_read_query("SELECT 1 AS taken FROM RoomNight LIMIT 1")
+    if calendar is None:
+        print("Occupancy calendar unavailable; run python -m backend.migrate")
+        return False
+    if calendar:
+        return True
+    try:
+        nights = rebuild_calendar()
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False
+    if nights:
+        print(f"Occupancy calendar filled with {nights} night(s)")
+    return True
+
+
+if __name__ == '__main__':
+    print(f"Occupancy calendar rebuilt with {rebuild_calendar()} night(s)")
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+
+class _PooledConnection:
+    """Bookkeeping for one physical connection held by the pool."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.uses = 0
+        self.last_used = time.monotonic()
+        # Prepared statements live as long as the connection they belong to
+        self.statements = {}
+
+
+class ConnectionPool:
+    """A bounded pool of reusable database connections.
+
+    - size: maximum number of connections open at the same time
+    - timeout: seconds to wait for a free connection before giving up
+    - max_uses: a connection is closed and replaced after this many checkouts
+    - ping_after: idle seconds after which a connection is pinged on checkout
+    """
+
+    def __init__(self, factory, size=5, timeout=10.0, max_uses=1000, ping_after=30.0):
+        self._factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.ping_after = ping_after
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._checked_out = {}
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Check out a healthy connection, or return None if one cannot be opened."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"No free connection within {self.timeout}s (pool size {self.size})")
+
+        try:
+            entry = self._take_idle()
+            if entry is None:
+                connection = self._factory()
+                if not connection or not connection.is_connected():
+                    self._slots.release()
+                    return None
+                entry = _PooledConnection(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        entry.uses += 1
+        with self._lock:
+            self._checked_out[id(entry.connection)] = entry
+        return entry.connection
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, closing it if it is worn out or broken."""
+        with self._lock:
+            entry = self._checked_out.pop(id(connection), None)
+        if entry is None:
+            return
+
+        try:
+            if discard or entry.uses >= self.max_uses:
+                self._close(connection)
+                return
+            try:
+                # End any open transaction so the next borrower sees fresh data
+                connection.rollback()
+            except Error:
+                self._close(connection)
+                return
+            entry.last_used = time.monotonic()
+            self._idle.put(entry)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and always returns it."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            if connection:
+                self.release(connection)
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(entry.connection)
+
+    def statements(self, connection):
+        """Per-connection cache of prepared cursors for a checked-out connection."""
+        with self._lock:
+            return self._checked_out[id(connection)].statements
+
+    def stats(self):
+        with self._lock:
+            in_use = len(self._checked_out)
+        return {'size': self.size, 'in_use': in_use, 'idle': self._idle.qsize()}
+
+    def _take_idle(self):
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - entry.last_used < self.ping_after:
+                return entry
+            try:
+                entry.connection.ping(reconnect=False)
+                return entry
+            except Error:
+                self._close(entry.connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Error:
+            pass
@@ -0,0 +1,105 @@
+"""Stay quotes with per-night price rules, for many rooms at once.
+
+A quote builds a rooms x nights matrix of nightly rates from each room's
+price, lets every PriceRule (see migrations/005_price_rules.sql) overwrite
+the cells it matches, and sums the rows. Each rule is one masked NumPy
+assignment however many rooms and nights are quoted, so a page of search
+results costs about the same as a single room.
+"""
+import os
+import numpy as np
+from mysql.connector import Error
+from .availability import to_date
+from .cache import TTLCache, read_through
+from .database import execute_query, execute_read_query, transaction
+from .invalidation import publish, subscribe
+
+MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = (1 << day for day in range(7))
+# Nights starting on Friday and Saturday
+WEEKEND_NIGHTS = FRIDAY | SATURDAY
+
+# Rules change rarely; writes below invalidate them explicitly
+rule_cache = TTLCache(maxsize=1, ttl=float(os.getenv('ROOM_CACHE_TTL', '300')))
+
+@read_through(rule_cache)
+def get_price_rules():
+    """All price rules, lowest rule_id (lowest precedence) first."""
+    return execute_read_query("SELECT * FROM PriceRule ORDER BY rule_id")
+
+def create_price_rule(label, room_id=None, start_date=None, end_date=None, weekdays=None,
+                      price=None, multiplier=None):
+    """Add a price rule (admin only); exactly one of price and multiplier must be given."""
+    if (price is None) == (multiplier is None):
+        return False, "Give either a nightly price or a multiplier."
+    query = """
+        INSERT INTO PriceRule (label, room_id, start_date, end_date, weekdays, price, multiplier)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+    try:
+        with transaction() as tx:
+            tx.execute_query(query, (label, room_id, start_date, end_date, weekdays, price, multiplier))
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False, "Failed to create price rule."
+    _rules_changed()
+    return True, "Price rule created successfully!"
+
+def delete_price_rule(rule_id):
+    """Delete a price rule (admin only)."""
+    if execute_query("DELETE FROM PriceRule WHERE rule_id = %s", (rule_id,)):
+        _rules_changed()
+        return True, "Price rule deleted successfully!"
+    return False, "Failed to delete price rule."
+
+def _rules_changed():
+    rule_cache.invalidate()
+    publish('price_rules')
+
+# Another worker changed the rules
+subscribe('price_rules', rule_cache.invalidate)
+
+def nightly_rates(rooms, check_in, check_out, rules=None):
+    """Rate matrix (len(rooms) x nights) for the stay [check_in, check_out)."""
+    nights = np.arange(np.datetime64(to_date(check_in), 'D'), np.datetime64(to_date(check_out), 'D'))
+    base = np.fromiter((float(room['price']) for room in rooms), dtype=float, count=len(rooms))
+    rates = np.repeat(base[:, None], len(nights), axis=1)
+    if rules is None:
+        rules = get_price_rules() or []
+    if not rates.size or not rules:
+        return rates
+
+    room_ids = np.fromiter((room['Room_id'] or 0 for room in rooms), dtype=np.int64, count=len(rooms))
+    # 1970-01-01 was a Thursday; weekday bits count from Monday
+    weekday_bits = 1 << ((nights.astype(np.int64) + 3) % 7)
+    for rule in rules:
+        if rule['price'] is None and rule['multiplier'] is None:
+            # Only rows written around create_price_rule can lack both; they set no rate
+            continue
+        on = np.ones(len(nights), dtype=bool)
+        if rule['start_date'] is not None:
+            on &= nights >= np.datetime64(to_date(rule['start_date']), 'D')
+        if rule['end_date'] is not None:
+            on &= nights <= np.datetime64(to_date(rule['end_date']), 'D')
+        if rule['weekdays']:
+            on &= (weekday_bits & int(rule['weekdays'])) != 0
+        rows = np.ones(len(rooms), dtype=bool) if rule['room_id'] is None else room_ids == rule['room_id']
+        if not on.any() or not rows.any():
+            continue
+        cells = np.ix_(rows, on)
+        if rule['price'] is not None:
+            rates[cells] = float(rule['price'])
+        else:
+            rates[cells] = base[rows, None] * float(rule['multiplier'])
+    return rates
+
+def quote_stays(rooms, check_in, check_out, rules=None):
+    """Totals of the stay for every room (aligned with rooms) and the number of nights."""
+    rates = nightly_rates(rooms, check_in, check_out, rules)
+    return np.round(rates.sum(axis=1), 2), rates.shape[1]
+
+def quote_rooms(rooms, check_in, check_out):
+    """Copies of rooms with stay_total and stay_nights set for [check_in, check_out)."""
+    if not rooms:
+        return rooms
+    totals, nights = quote_stays(rooms, check_in, check_out)
+    return [{**room, 'stay_total': float(total), 'stay_nights': nights} for room, total in zip(rooms, totals)]
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import math
+from mysql.connector import Error
+from .database import transaction
+from .rooms import get_all_locations, refresh_after_import
+
+IMPORT_FIELDS = ['price', 'description', 'image_url', 'postal_code', 'city', 'area']
+# Column limits from db.sql; a row over them would fail its whole chunk
+MAX_PRICE = 99999999.99  # DECIMAL(10, 2)
+MAX_LENGTHS = {'postal_code': 20, 'city': 100, 'area': 100, 'image_url': 500}
+
+def parse_rooms_file(filename, content):
+    """Parse an uploaded CSV or JSON file into a list of room dicts."""
+    text = content.decode('utf-8-sig') if isinstance(content, bytes) else content
+    if filename.lower().endswith('.json'):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of room objects")
+        return rows
+    return list(csv.DictReader(io.StringIO(text)))
+
+def validate_room(row, known_locations):
+    """Return (room, error) for one import row; exactly one of them is None."""
+    if not isinstance(row, dict):
+        return None, "Row is not an object"
+    row = {key.strip().lower(): value for key, value in row.items() if key}
+    try:
+        price = float(row.get('price') or '')
+    except (TypeError, ValueError):
+        return None, "Invalid price"
+    if not math.isfinite(price):
+        return None, "Invalid price"
+    if price <= 0:
+        return None, "Price must be positive"
+    if round(price, 2) > MAX_PRICE:
+        return None, f"Price must be at most {MAX_PRICE:.2f}"
+
+    postal_code = str(row.get('postal_code') or '').strip()
+    if not postal_code:
+        return None, "Missing postal_code"
+    city = str(row.get('city') or '').strip()
+    area = str(row.get('area') or '').strip()
+    if postal_code not in known_locations and not (city and area):
+        return None, f"Unknown postal_code {postal_code}; city and area are required to add it"
+
+    description = str(row.get('description') or '').strip()
+    if not description:
+        return None, "Missing description"
+    image_url = str(row.get('image_url') or '').strip() or None
+    for field, value in (('postal_code', postal_code), ('city', city), ('area', area), ('image_url', image_url)):
+        if value and len(value) > MAX_LENGTHS[field]:
+            return None, f"{field} is longer than {MAX_LENGTHS[field]} characters"
+    return {'price': price, 'description': description, 'image_url': image_url,
+            'postal_code': postal_code, 'city': city, 'area': area}, None
+
+def import_rooms(rows, admin_id, chunk_size=1000, progress=None):
+    """Validate and bulk-insert rooms, creating missing locations.
+
+    Rows are written with executemany in chunk_size transactions, so a
+    failed chunk rolls back on its own and the rest still load.
+    progress(processed, total) is called after every chunk.
+
+    Returns {'imported': n, 'errors': [(row_number, message), ...]}.
+    """
+    known_locations = {loc['Postal_code'] for loc in get_all_locations() or []}
+    rooms, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        room, error = validate_room(row, known_locations)
+        if error:
+            errors.append((number, error))
+        else:
+            rooms.append((number, room))
+
+    location_query = """
+        INSERT INTO Location (Postal_code, city, area) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE city=city
+    """
+    room_query = "INSERT INTO Room (price, description, image_url, Postal_code, admin_id) VALUES (%s, %s, %s, %s, %s)"
+
+    imported = 0
+    new_locations = False
+    for start in range(0, len(rooms), chunk_size):
+        chunk = rooms[start:start + chunk_size]
+        locations = {room['postal_code']: (room['postal_code'], room['city'], room['area'])
+                     for _, room in chunk if room['postal_code'] not in known_locations}
+        try:
+            with transaction() as tx:
+                if locations:
+                    tx.execute_many(location_query, list(locations.values()))
+                tx.execute_many(room_query, [
+                    (room['price'], room['description'], room['image_url'], room['postal_code'], admin_id)
+                    for _, room in chunk
+                ])
+        except Error as e:
+            print(f"The error '{e}' occurred")
+            errors.extend((number, f"Chunk failed: {e}") for number, _ in chunk)
+        else:
+            imported += len(chunk)
+            known_locations.update(locations)
+            new_locations = new_locations or bool(locations)
+        if progress:
+            progress(len(errors) + imported, len(rows))
+
+    if imported:
+        refresh_after_import(new_locations)
+    errors.sort()
+    return {'imported': imported, 'errors': errors}
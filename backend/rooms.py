@@ -1,8 +1,49 @@
-from .database import execute_query, execute_read_query
+import os
+from mysql.connector import Error
+from .database import (
+    execute_named_read_query, execute_query, execute_read_query, get_replica_pools, primary_reads,
+    register_query, transaction,
+)
+from . import bookings  # noqa: F401 - registers room_conflicts for is_room_available
+from .availability import availability_index
+from .search_index import search_index, load_search_index
+from .cache import TTLCache, read_through
+from .images import can_ingest, get_image_pipeline
+from .invalidation import publish, subscribe
 from datetime import date
 
+# Room rows and locations change rarely; writes below invalidate them explicitly
+room_cache = TTLCache(
+    maxsize=int(os.getenv('ROOM_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('ROOM_CACHE_TTL', '300')),
+)
+
+# Most index matches looked up in one statement
+SEARCH_CHUNK_SIZE = 500
+
+ROOMS_QUERY = """
+    SELECT r.*, l.city, l.area, l.Postal_code
+    FROM Room r
+    LEFT JOIN Location l ON r.Postal_code = l.Postal_code
+"""
+register_query('room_details', ROOMS_QUERY + " WHERE r.Room_id = %s")
+# Correlated per room, so a page stops scanning once it has limit + 1 rooms
+register_query('available_rooms_after', ROOMS_QUERY + """
+    WHERE r.Room_id > %s
+    AND NOT EXISTS (
+        SELECT 1 FROM Booking b
+        WHERE b.room_id = r.Room_id
+        AND b.status IN ('Pending', 'Confirmed')
+        AND b.check_out_date >= CURDATE()
+    )
+    ORDER BY r.Room_id LIMIT %s
+""")
+
 def get_all_available_rooms():
     """Get all rooms that are not currently booked."""
+    if availability_index.loaded:
+        rooms = execute_read_query(ROOMS_QUERY)
+        return _without_active_bookings(rooms)
     query = """
         SELECT r.*, l.city, l.area, l.Postal_code
         FROM Room r
@@ -16,62 +57,139 @@ def get_all_available_rooms():
     """
     return execute_read_query(query)
 
-def search_rooms(search_query):
-    """Search rooms by city or area."""
-    query = """
-        SELECT r.*, l.city, l.area, l.Postal_code
-        FROM Room r
-        LEFT JOIN Location l ON r.Postal_code = l.Postal_code
-        WHERE (l.city LIKE %s OR l.area LIKE %s)
-        AND r.Room_id NOT IN (
-            SELECT DISTINCT room_id 
-            FROM Booking 
-            WHERE status IN ('Pending', 'Confirmed')
-            AND check_out_date >= CURDATE()
-        )
+def search_rooms(search_query, check_in=None, check_out=None, limit=None):
+    """Search rooms by city or area.
+
+    With the in-memory search index loaded, descriptions are searched too,
+    typos and word prefixes match, and results come best match first.
+
+    With check_in/check_out, returns rooms free for that stay; otherwise
+    rooms without any current or upcoming booking. limit caps the number
+    of rooms returned.
+    """
+    conditions, params = [], []
+    ranked_ids = None
+    if search_query and search_index.loaded:
+        ranked_ids = search_index.search(search_query)
+        if not ranked_ids:
+            return []
+    elif search_query:
+        search_pattern = f"%{search_query}%"
+        conditions.append("(l.city LIKE %s OR l.area LIKE %s)")
+        params += [search_pattern, search_pattern]
+
+    if check_in and check_out:
+        if not availability_index.loaded:
+            # Written against Booking(room_id, status, check_in_date, check_out_date)
+            conditions.append("""NOT EXISTS (
+                SELECT 1 FROM Booking b
+                WHERE b.room_id = r.Room_id
+                AND b.status IN ('Pending', 'Confirmed')
+                AND b.check_in_date < %s
+                AND b.check_out_date > %s
+            )""")
+            params += [check_out, check_in]
+    elif not availability_index.loaded:
+        conditions.append("""r.Room_id NOT IN (
+                SELECT DISTINCT room_id 
+                FROM Booking 
+                WHERE status IN ('Pending', 'Confirmed')
+                AND check_out_date >= CURDATE()
+            )""")
+
+    if ranked_ids is None:
+        rooms = _available_matches(conditions, params, check_in, check_out)
+        return rooms[:limit] if rooms and limit else rooms
+
+    # Index matches are looked up a bounded number of ids per statement,
+    # best first, until limit rooms are free
+    chunk_size = min(limit or SEARCH_CHUNK_SIZE, SEARCH_CHUNK_SIZE)
+    found = []
+    for start in range(0, len(ranked_ids), chunk_size):
+        chunk = ranked_ids[start:start + chunk_size]
+        rooms = _available_matches(conditions + [f"r.Room_id IN ({', '.join(['%s'] * len(chunk))})"],
+                                   params + chunk, check_in, check_out)
+        if rooms is None:
+            return None
+        rank = {room_id: i for i, room_id in enumerate(chunk)}
+        rooms.sort(key=lambda room: rank[room['Room_id']])
+        found += rooms
+        if limit and len(found) >= limit:
+            return found[:limit]
+    return found
+
+def _available_matches(conditions, params, check_in, check_out):
+    query = ROOMS_QUERY
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    rooms = execute_read_query(query, tuple(params))
+    if rooms is None or not availability_index.loaded:
+        return rooms
+    if check_in and check_out:
+        busy = availability_index.booked_rooms(check_in, check_out)
+        return [room for room in rooms if room['Room_id'] not in busy]
+    return _without_active_bookings(rooms)
+
+def get_available_rooms_page(after_room_id=None, limit=24):
+    """Get one page of available rooms ordered by Room_id (keyset pagination).
+
+    Returns (rooms, next_cursor); pass next_cursor back as after_room_id
+    for the following page. next_cursor is None on the last page.
     """
-    search_pattern = f"%{search_query}%"
-    return execute_read_query(query, (search_pattern, search_pattern))
+    # One extra row tells us whether another page exists
+    rooms = execute_named_read_query('available_rooms_after', (after_room_id or 0, limit + 1))
+    if rooms is None:
+        return None, None
+    if len(rooms) <= limit:
+        return rooms, None
+    rooms = rooms[:limit]
+    return rooms, rooms[-1]['Room_id']
 
+def _without_active_bookings(rooms):
+    if rooms is None:
+        return None
+    busy = availability_index.rooms_active_on_or_after(date.today())
+    return [room for room in rooms if room['Room_id'] not in busy]
+
+@read_through(room_cache)
 def get_room_details(room_id):
     """Get detailed information about a specific room."""
-    query = """
-        SELECT r.*, l.city, l.area, l.Postal_code
-        FROM Room r
-        LEFT JOIN Location l ON r.Postal_code = l.Postal_code
-        WHERE r.Room_id = %s
-    """
-    results = execute_read_query(query, (room_id,))
+    results = execute_named_read_query('room_details', (room_id,))
     return results[0] if results else None
 
 def is_room_available(room_id, check_in, check_out):
     """Check if a room is available for the given dates."""
-    query = """
-        SELECT COUNT(*) as conflict_count
-        FROM Booking
-        WHERE room_id = %s
-        AND status IN ('Pending', 'Confirmed')
-        AND (
-            (check_in_date <= %s AND check_out_date >= %s)
-            OR (check_in_date <= %s AND check_out_date >= %s)
-            OR (check_in_date >= %s AND check_out_date <= %s)
-        )
-    """
-    result = execute_read_query(query, (room_id, check_in, check_in, check_out, check_out, check_in, check_out))
+    if availability_index.loaded:
+        return availability_index.is_available(room_id, check_in, check_out)
+    result = execute_named_read_query('room_conflicts', (room_id, check_out, check_in))
     return result[0]['conflict_count'] == 0 if result else False
 
 # Admin functions
 def create_room(price, description, image_url, postal_code, admin_id):
     """Create a new room (admin only)."""
     query = "INSERT INTO Room (price, description, image_url, Postal_code, admin_id) VALUES (%s, %s, %s, %s, %s)"
-    if execute_query(query, (price, description, image_url, postal_code, admin_id)):
-        return True, "Room created successfully!"
-    return False, "Failed to create room."
+    try:
+        with transaction() as tx:
+            room_id = tx.execute_query(query, (price, description, image_url, postal_code, admin_id))
+    except Error as e:
+        print(f"The error '{e}' occurred")
+        return False, "Failed to create room."
+    _invalidate_room(room_id)
+    _reindex_room(room_id)
+    schedule_image(room_id, image_url)
+    return True, "Room created successfully!"
 
 def update_room(room_id, price, description, image_url, postal_code):
     """Update room details (admin only)."""
+    previous = get_room_details(room_id)
     query = "UPDATE Room SET price = %s, description = %s, image_url = %s, Postal_code = %s WHERE Room_id = %s"
     if execute_query(query, (price, description, image_url, postal_code, room_id)):
+        if not previous or previous.get('image_url') != image_url:
+            # The stored variants belong to the old URL
+            execute_query("UPDATE Room SET image_key = NULL WHERE Room_id = %s", (room_id,))
+            schedule_image(room_id, image_url)
+        _invalidate_room(room_id)
+        _reindex_room(room_id)
         return True, "Room updated successfully!"
     return False, "Failed to update room."
 
@@ -79,9 +197,86 @@ def delete_room(room_id):
     """Delete a room (admin only)."""
     query = "DELETE FROM Room WHERE Room_id = %s"
     if execute_query(query, (room_id,)):
+        # Bookings of the room are removed by ON DELETE CASCADE
+        availability_index.drop_room(room_id)
+        _invalidate_room(room_id)
+        search_index.remove_room(room_id)
         return True, "Room deleted successfully!"
     return False, "Failed to delete room."
 
+def _invalidate_room(room_id):
+    _forget_room(room_id)
+    publish('room', int(room_id))
+
+def _forget_room(room_id):
+    room_cache.invalidate(('get_room_details', int(room_id)))
+    room_cache.invalidate(('get_all_rooms',))
+    if get_replica_pools():
+        # Refill from the primary before a read from a lagging replica can
+        with primary_reads():
+            get_room_details(int(room_id))
+
+def _room_changed_elsewhere(room_id):
+    """Another worker created, edited or deleted the room."""
+    _forget_room(room_id)
+    if not search_index.loaded and not availability_index.loaded:
+        return
+    rows = execute_named_read_query('room_details', (room_id,))
+    if rows is None:
+        return
+    if rows:
+        if search_index.loaded:
+            search_index.add_room(rows[0])
+    else:
+        search_index.remove_room(room_id)
+        availability_index.drop_room(room_id)
+
+def refresh_after_import(new_locations):
+    """Bring caches and the search index up to date after a bulk room import."""
+    _rooms_imported(new_locations)
+    publish('rooms_imported', bool(new_locations))
+    ingest_missing_images()
+
+def _rooms_imported(new_locations):
+    room_cache.invalidate(('get_all_rooms',))
+    if new_locations:
+        room_cache.invalidate(('get_all_locations',))
+    # Ids of batch inserts are not guaranteed to be consecutive; reload instead
+    if search_index.loaded:
+        load_search_index()
+
+subscribe('room', _room_changed_elsewhere)
+subscribe('rooms_imported', _rooms_imported)
+
+def schedule_image(room_id, image_url):
+    """Queue a room's image for the thumbnail pipeline; returns the future or None."""
+    pipeline = get_image_pipeline()
+    if pipeline is None or not can_ingest(image_url):
+        return None
+
+    def store_key(image_key):
+        # The URL check drops results for an image that was replaced meanwhile
+        query = "UPDATE Room SET image_key = %s WHERE Room_id = %s AND image_url = %s"
+        if execute_query(query, (image_key, room_id, image_url)):
+            _invalidate_room(room_id)
+
+    return pipeline.submit(image_url, store_key)
+
+def ingest_missing_images():
+    """Queue every room whose image has no variants yet; returns the futures."""
+    rooms = execute_read_query(
+        "SELECT Room_id, image_url FROM Room WHERE image_url IS NOT NULL AND image_key IS NULL"
+    ) or []
+    futures = [schedule_image(room['Room_id'], room['image_url']) for room in rooms]
+    return [future for future in futures if future is not None]
+
+def _reindex_room(room_id):
+    if search_index.loaded:
+        room = get_room_details(room_id)
+        if room:
+            search_index.add_room(room)
+
+@read_through(room_cache)
 def get_all_rooms():
     """Get all rooms (for admin management)."""
     query = """
@@ -91,6 +286,7 @@ def get_all_rooms():
     """
     return execute_read_query(query)
 
+@read_through(room_cache)
 def get_all_locations():
     """Get all available locations."""
     return execute_read_query("SELECT * FROM Location")
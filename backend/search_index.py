@@ -0,0 +1,217 @@
+import bisect
+import os
+import re
+import threading
+from collections import Counter
+from .database import execute_read_query, primary_reads
+
+_WORD = re.compile(r'\w+')
+
+# How much a hit counts depending on where the word appears and how it matched
+LOCATION_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+FUZZY_MATCH = 0.6
+
+def tokenize(text):
+    return _WORD.findall(text.lower()) if text else []
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def one_edit_apart(a, b):
+    """True if one insertion, deletion, substitution or adjacent swap turns a into b."""
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if abs(len(a) - len(b)) != 1:
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    return shorter in deletions(longer)
+
+
+class RoomSearchIndex:
+    """In-memory inverted index over room locations and descriptions.
+
+    Each query word matches index words exactly, by prefix (for
+    search-as-you-type), by trigram similarity or by a single edit (for
+    typos; the edit catches swapped letters, which share few trigrams).
+    Every query word must match; rooms are ranked by the summed match
+    scores, with city/area hits counting double.
+    """
+
+    def __init__(self, min_similarity=0.5, max_expansions=64):
+        self.min_similarity = min_similarity
+        self.max_expansions = max_expansions
+        self._postings = {}
+        self._room_words = {}
+        self._grams = {}
+        self._deletes = {}
+        self._vocabulary = []
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def load(self, rooms):
+        """Replace the index contents with room rows (Room_id, city, area, description)."""
+        with self._lock:
+            self._postings = {}
+            self._room_words = {}
+            self._grams = {}
+            self._deletes = {}
+            self._vocabulary = []
+            for room in rooms:
+                self._add(room)
+            self._vocabulary = sorted(self._postings)
+            self.loaded = True
+
+    def add_room(self, room):
+        """Index a room, replacing any previous version of it."""
+        with self._lock:
+            self._remove(room['Room_id'])
+            for word in self._add(room):
+                i = bisect.bisect_left(self._vocabulary, word)
+                if i == len(self._vocabulary) or self._vocabulary[i] != word:
+                    self._vocabulary.insert(i, word)
+
+    def remove_room(self, room_id):
+        with self._lock:
+            self._remove(room_id)
+
+    def search(self, query, limit=None):
+        """Return matching room ids, best match first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            # Most selective word first, so later words only probe the survivors
+            expanded = [[(self._postings[word], quality) for word, quality in self._expand(token)]
+                        for token in tokens]
+            expanded.sort(key=lambda matches: sum(len(postings) for postings, _ in matches))
+            scores = None
+            for matches in expanded:
+                if scores is None:
+                    token_scores = {}
+                    for postings, quality in matches:
+                        for room_id, weight in postings.items():
+                            score = quality * weight
+                            if score > token_scores.get(room_id, 0):
+                                token_scores[room_id] = score
+                    scores = token_scores
+                else:
+                    narrowed = {}
+                    for room_id, total in scores.items():
+                        best = max((quality * postings.get(room_id, 0) for postings, quality in matches), default=0)
+                        if best:
+                            narrowed[room_id] = total + best
+                    scores = narrowed
+                if not scores:
+                    return []
+        ranked = sorted(scores, key=lambda room_id: (-scores[room_id], room_id))
+        return ranked[:limit] if limit else ranked
+
+    def _expand(self, token):
+        """Yield (index word, match quality) pairs for one query word."""
+        exact = token in self._postings
+        if exact:
+            yield token, EXACT_MATCH
+
+        i = bisect.bisect_left(self._vocabulary, token)
+        expansions = 0
+        while i < len(self._vocabulary) and expansions < self.max_expansions:
+            word = self._vocabulary[i]
+            if not word.startswith(token):
+                break
+            if word != token:
+                yield word, PREFIX_MATCH
+                expansions += 1
+            i += 1
+
+        if exact or len(token) < 3:
+            return
+        token_grams = trigrams(token)
+        shared = Counter()
+        for gram in token_grams:
+            shared.update(self._grams.get(gram, ()))
+        fuzzy = set()
+        for word, count in shared.most_common(self.max_expansions):
+            similarity = 2 * count / (len(token_grams) + len(trigrams(word)))
+            if similarity >= self.min_similarity and not word.startswith(token):
+                fuzzy.add(word)
+                yield word, FUZZY_MATCH * similarity
+
+        # Words one edit away share a variant with one letter deleted
+        candidates = set(self._deletes.get(token, ()))
+        for variant in deletions(token):
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        for word in sorted(candidates - fuzzy):
+            if not word.startswith(token) and one_edit_apart(token, word):
+                yield word, FUZZY_MATCH * (1 - 1 / len(token))
+
+    def _add(self, room):
+        room_id = room['Room_id']
+        weights = {}
+        for word in tokenize(room.get('description')):
+            weights[word] = DESCRIPTION_WEIGHT
+        for word in tokenize(room.get('city')) + tokenize(room.get('area')):
+            weights[word] = LOCATION_WEIGHT
+
+        new_words = []
+        for word, weight in weights.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                new_words.append(word)
+                for gram in trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+                for variant in deletions(word):
+                    self._deletes.setdefault(variant, set()).add(word)
+            postings[room_id] = weight
+        self._room_words[room_id] = set(weights)
+        return new_words
+
+    def _remove(self, room_id):
+        for word in self._room_words.pop(room_id, ()):
+            postings = self._postings[word]
+            postings.pop(room_id, None)
+            if postings:
+                continue
+            del self._postings[word]
+            for index, keys in ((self._grams, trigrams(word)), (self._deletes, deletions(word))):
+                for key in keys:
+                    words = index.get(key)
+                    if words:
+                        words.discard(word)
+                        if not words:
+                            del index[key]
+            i = bisect.bisect_left(self._vocabulary, word)
+            if i < len(self._vocabulary) and self._vocabulary[i] == word:
+                del self._vocabulary[i]
+
+
+search_index = RoomSearchIndex()
+
+def load_search_index():
+    """Load every room into the search index (called once at startup)."""
+    if os.getenv('SEARCH_INDEX', '1') != '1':
+        return False
+    with primary_reads():
+        rows = execute_read_query("""
+            SELECT r.Room_id, r.description, l.city, l.area
+            FROM Room r
+            LEFT JOIN Location l ON r.Postal_code = l.Postal_code
+        """)
+    if rows is None:
+        print("Search index not loaded; falling back to database queries")
+        return False
+    search_index.load(rows)
+    return True
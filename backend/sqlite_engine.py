@@ -0,0 +1,210 @@
+"""Embedded SQLite engine behind the mysql.connector-style API the backend uses.
+
+Connections and cursors mimic the parts of mysql.connector the backend
+relies on (dictionary cursors, lastrowid/rowcount, ping, is_connected) and
+queries written for MySQL are translated on the fly:
+
+- %s placeholders become ?
+- CURDATE() and LAST_INSERT_ID() map to their SQLite equivalents
+- backticked identifiers such as `e-mail` become "e-mail"
+- SELECT ... FOR UPDATE takes the database write lock (BEGIN IMMEDIATE)
+- ON DUPLICATE KEY UPDATE col=col becomes ON CONFLICT DO NOTHING
+- INT AUTO_INCREMENT PRIMARY KEY becomes INTEGER PRIMARY KEY AUTOINCREMENT
+
+Errors are re-raised as mysql.connector errors so callers' existing
+except clauses keep working.
+"""
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from mysql.connector import errors
+
+_TOKENS = re.compile(r"""
+    (?P<string>'(?:[^']|'')*')
+  | `(?P<ident>[^`]*)`
+  | (?P<placeholder>%s)
+  | (?P<percent>%%)
+  | (?P<curdate>\bCURDATE\(\s*\))
+  | (?P<last_id>\bLAST_INSERT_ID\(\s*\))
+  | (?P<for_update>\s+FOR\s+UPDATE\b)
+  | (?P<upsert>\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(?P<col>\w+)\s*=\s*(?P=col)\b)
+  | (?P<auto_pk>\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b)
+""", re.IGNORECASE | re.VERBOSE)
+
+_REPLACEMENTS = {
+    'placeholder': '?',
+    'percent': '%',
+    'curdate': "date('now', 'localtime')",
+    'last_id': 'last_insert_rowid()',
+    'for_update': '',
+    'upsert': 'ON CONFLICT DO NOTHING',
+    'auto_pk': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+}
+
+_translated = {}
+
+# Every DECIMAL column in the schema is DECIMAL(10, 2)
+_CENTS = Decimal('0.01')
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()).quantize(_CENTS))
+
+
+def translate(query):
+    """Rewrite a MySQL query for SQLite; returns (query, locks_for_update)."""
+    result = _translated.get(query)
+    if result is None:
+        locks = False
+
+        def replace(match):
+            nonlocal locks
+            kind = match.lastgroup
+            if kind == 'string':
+                return match.group(0)
+            if kind == 'ident':
+                return '"' + match.group('ident') + '"'
+            if kind == 'for_update':
+                locks = True
+            return _REPLACEMENTS[kind]
+
+        result = (_TOKENS.sub(replace, query), locks)
+        # Generated IN lists make many distinct strings; keep the memo bounded
+        if len(_translated) < 4096:
+            _translated[query] = result
+    return result
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _error(e):
+    """The mysql.connector exception matching a sqlite3 one."""
+    if isinstance(e, sqlite3.IntegrityError):
+        cls = errors.IntegrityError
+    elif isinstance(e, sqlite3.OperationalError):
+        cls = errors.OperationalError
+    elif isinstance(e, sqlite3.ProgrammingError):
+        cls = errors.ProgrammingError
+    else:
+        cls = errors.DatabaseError
+    return cls(msg=str(e))
+
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        if dictionary:
+            self._cursor.row_factory = _dict_row
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, params=()):
+        query, locks = translate(query)
+        try:
+            if locks and not self._connection.raw.in_transaction:
+                self._cursor.execute('BEGIN IMMEDIATE')
+            self._cursor.execute(query, params or ())
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def executemany(self, query, seq_params):
+        query, _ = translate(query)
+        try:
+            self._cursor.executemany(query, seq_params)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def fetchall(self):
+        try:
+            return self._cursor.fetchall()
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def fetchmany(self, size):
+        try:
+            return self._cursor.fetchmany(size)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def fetchone(self):
+        try:
+            return self._cursor.fetchone()
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A sqlite3 connection wearing the mysql.connector connection interface."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None, prepared=None):
+        # SQLite cursors always step lazily, and sqlite3 already keeps compiled
+        # statements per connection; buffered and prepared are accepted for compatibility
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def commit(self):
+        try:
+            self.raw.commit()
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def rollback(self):
+        try:
+            self.raw.rollback()
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def is_connected(self):
+        try:
+            self.raw.execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def ping(self, reconnect=False):
+        if not self.is_connected():
+            raise errors.InterfaceError(msg="SQLite connection is closed")
+
+    def close(self):
+        self.raw.close()
+
+
+def connect(path, busy_timeout=5.0):
+    """Open a WAL-mode connection that pooled threads may share one at a time."""
+    try:
+        raw = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            # Writes implicitly BEGIN IMMEDIATE, so a transaction never
+            # fails halfway through trying to upgrade a read lock
+            isolation_level='IMMEDIATE',
+            check_same_thread=False,
+        )
+        raw.execute('PRAGMA journal_mode=WAL')
+        raw.execute('PRAGMA synchronous=NORMAL')
+        raw.execute('PRAGMA foreign_keys=ON')
+    except sqlite3.Error as e:
+        raise _error(e) from e
+    return SQLiteConnection(raw)
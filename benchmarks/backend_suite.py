@@ -0,0 +1,207 @@
+"""Latency and throughput benchmark for the backend data layer.
+
+Times the hot backend functions against a generated dataset and writes
+the results to JSON so runs can be compared across commits:
+
+    python -m benchmarks.backend_suite --scale 100k --generate --output results-100k.json
+    python -m benchmarks.backend_suite --scale 100k --compare results-100k.json
+"""
+import argparse
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from backend import bookings, pricing, rooms
+from backend.availability import availability_index, load_availability_index
+from backend.database import execute_query
+from backend.metrics import metrics
+from backend.search_index import load_search_index
+from benchmarks.common import git_commit, print_comparison, summarize, write_json
+from benchmarks.datagen import CITIES, SCALES, prepare, sizes, use_database
+
+def build_cases(rng, counts, today):
+    """Map benchmark name -> (callable producing one call, default iterations, teardown or None)."""
+    def random_stay(min_days=1, max_days=90):
+        check_in = today + timedelta(days=rng.randint(min_days, max_days))
+        return check_in.isoformat(), (check_in + timedelta(days=rng.randint(1, 7))).isoformat()
+
+    def random_room():
+        return rng.randint(1, counts['rooms'])
+
+    def search_text():
+        return rooms.search_rooms(rng.choice(CITIES))
+
+    def search_dates():
+        return rooms.search_rooms(rng.choice(CITIES), *random_stay())
+
+    def available_page():
+        return rooms.get_available_rooms_page(rng.randint(0, counts['rooms']), 24)
+
+    def room_available():
+        return rooms.is_room_available(random_room(), *random_stay())
+
+    def user_bookings():
+        return bookings.get_user_bookings(rng.randint(1, counts['users']))
+
+    quoted = []
+
+    def quote_results():
+        # A large page of search results, quoted for one stay in a single pass
+        if not quoted:
+            quoted.extend((rooms.get_all_rooms() or [])[:500])
+        return pricing.quote_rooms(quoted, *random_stay())
+
+    created = []
+
+    def book():
+        # Far-future stays keep the generated calendar intact
+        check_in, check_out = random_stay(400, 4000)
+        room_id = random_room()
+        result = bookings.create_booking(rng.randint(1, counts['users']), room_id, check_in, check_out, 100)
+        if result[0]:
+            created.append(result[2])
+        return result
+
+    def remove_created():
+        # Later runs with the same seed book the same stays again
+        remove_bookings(created)
+        created.clear()
+
+    return {
+        'search_rooms': (search_text, 100, None),
+        'search_rooms_dates': (search_dates, 100, None),
+        'get_all_available_rooms': (rooms.get_all_available_rooms, 10, None),
+        'get_available_rooms_page': (available_page, 200, None),
+        'is_room_available': (room_available, 500, None),
+        'get_user_bookings': (user_bookings, 500, None),
+        'quote_rooms': (quote_results, 200, None),
+        'create_booking': (book, 200, remove_created),
+    }
+
+def remove_bookings(booking_ids, chunk_size=500):
+    """Delete benchmark bookings (payments and calendar nights cascade)."""
+    for start in range(0, len(booking_ids), chunk_size):
+        chunk = booking_ids[start:start + chunk_size]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        execute_query(f"DELETE FROM Booking WHERE booking_id IN ({placeholders})", tuple(chunk))
+        for booking_id in chunk:
+            availability_index.remove(booking_id)
+
+def failed(result):
+    """True for the failure results of backend calls: None or a (False, ...) tuple."""
+    return result is None or (isinstance(result, tuple) and bool(result) and result[0] in (None, False))
+
+def run_case(func, iterations, threads, warmup):
+    """Latency summary of the successful calls, plus the number of failed ones."""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+    per_thread = max(1, iterations // threads)
+
+    def worker():
+        nonlocal failures
+        local, local_failures = [], 0
+        for _ in range(per_thread):
+            # Backend functions print and swallow database errors, so count those too
+            errors = metrics.total('roomify_db_errors_total')
+            started = time.perf_counter()
+            try:
+                ok = not failed(func())
+            except Exception as e:
+                print(f"The error '{e}' occurred")
+                ok = False
+            seconds = time.perf_counter() - started
+            if ok and metrics.total('roomify_db_errors_total') == errors:
+                local.append(seconds)
+            else:
+                local_failures += 1
+        with lock:
+            latencies.extend(local)
+            failures += local_failures
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary['failures'] = failures
+    summary['failure_rate'] = round(failures / (per_thread * threads), 4)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default='roomify_bench')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--generate', action='store_true', help='(re)create and populate the database first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--threads', type=int, default=1, help='concurrent callers per function')
+    parser.add_argument('--iterations', type=float, default=1.0, help='multiplier for each function\'s default call count')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--with-indexes', action='store_true', help='load the in-memory availability and search indexes')
+    parser.add_argument('--only', nargs='*', help='benchmark names to run')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    use_database(args.database)
+    os.environ.setdefault('DB_POOL_SIZE', str(max(5, args.threads)))
+    if args.generate:
+        started = time.perf_counter()
+        try:
+            prepare(args.database, args.scale, args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Generated {args.scale} dataset in {time.perf_counter() - started:.1f}s")
+
+    if args.with_indexes:
+        load_availability_index()
+        load_search_index()
+
+    rng = random.Random(args.seed)
+    cases = build_cases(rng, sizes(SCALES[args.scale]), date.today())
+    results = {}
+    for name, (func, iterations, teardown) in cases.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            results[name] = run_case(func, max(1, int(iterations * args.iterations)), args.threads, args.warmup)
+        finally:
+            if teardown:
+                teardown()
+        r = results[name]
+        if r['calls']:
+            print(f"{name:28s} p50={r['p50_ms']:>9.3f}ms p95={r['p95_ms']:>9.3f}ms "
+                  f"p99={r['p99_ms']:>9.3f}ms  {r['throughput_per_s']:>9.1f}/s  failed={r['failure_rate']:.1%}")
+        else:
+            print(f"{name:28s} failed={r['failure_rate']:.1%}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'scale': args.scale,
+            'threads': args.threads,
+            'with_indexes': args.with_indexes,
+            'python': platform.python_version(),
+        },
+        'results': results,
+    }
+    if args.output:
+        write_json(args.output, report)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        print_comparison(report, args.compare)
+    failing = [name for name, r in results.items() if r['failures']]
+    if failing:
+        print(f"Failed calls in: {', '.join(failing)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Booking contention benchmark.
+
+Many concurrent clients try to book random date ranges on a small set of
+"hot" rooms through backend.bookings.create_booking. Reports throughput,
+conflict rate and verifies that no two active bookings overlap.
+
+Run from the project root against a scratch database:
+
+    python -m benchmarks.booking_contention --clients 32 --rooms 4 --attempts 50
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+from backend.database import execute_query, execute_read_query, transaction
+from backend.bookings import create_booking
+from benchmarks.common import summarize
+
+def setup(num_rooms):
+    """Create a benchmark user and the hot rooms; return (user_id, room_ids)."""
+    with transaction() as tx:
+        user_id = tx.execute_query(
+            "INSERT INTO USER (name, `e-mail`, phone, password) VALUES (%s, %s, %s, %s)",
+            ('Benchmark', f'bench-{time.time_ns()}@roomify.local', '0', '-'),
+        )
+        room_ids = [
+            tx.execute_query(
+                "INSERT INTO Room (price, description) VALUES (%s, %s)",
+                (100, 'booking contention benchmark'),
+            )
+            for _ in range(num_rooms)
+        ]
+    return user_id, room_ids
+
+def teardown(user_id, room_ids):
+    """Remove benchmark rows (bookings and payments cascade)."""
+    placeholders = ', '.join(['%s'] * len(room_ids))
+    execute_query(f"DELETE FROM Room WHERE Room_id IN ({placeholders})", tuple(room_ids))
+    execute_query("DELETE FROM USER WHERE user_id = %s", (user_id,))
+
+def count_overlaps(room_ids):
+    """Count pairs of active bookings on the same room whose stays overlap."""
+    placeholders = ', '.join(['%s'] * len(room_ids))
+    query = f"""
+        SELECT COUNT(*) AS overlaps
+        FROM Booking a
+        JOIN Booking b ON a.room_id = b.room_id AND a.booking_id < b.booking_id
+        WHERE a.room_id IN ({placeholders})
+        AND a.status IN ('Pending', 'Confirmed') AND b.status IN ('Pending', 'Confirmed')
+        AND a.check_in_date < b.check_out_date AND b.check_in_date < a.check_out_date
+    """
+    result = execute_read_query(query, tuple(room_ids))
+    return result[0]['overlaps'] if result else None
+
+def run(clients, num_rooms, attempts, horizon_days, max_nights, seed):
+    user_id, room_ids = setup(num_rooms)
+    start_day = date.today() + timedelta(days=1)
+    counts = {'booked': 0, 'conflict': 0, 'error': 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed + index)
+        local = {'booked': 0, 'conflict': 0, 'error': 0}
+        local_latencies = []
+        for _ in range(attempts):
+            room_id = rng.choice(room_ids)
+            check_in = start_day + timedelta(days=rng.randrange(horizon_days))
+            check_out = check_in + timedelta(days=rng.randint(1, max_nights))
+            started = time.perf_counter()
+            success, message, _ = create_booking(user_id, room_id, check_in.isoformat(), check_out.isoformat(), 100)
+            local_latencies.append(time.perf_counter() - started)
+            if success:
+                local['booked'] += 1
+            elif 'not available' in message:
+                local['conflict'] += 1
+            else:
+                local['error'] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+            latencies.extend(local_latencies)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    overlaps = count_overlaps(room_ids)
+    teardown(user_id, room_ids)
+
+    total = sum(counts.values())
+    print(f"clients={clients} hot_rooms={num_rooms} attempts={total} elapsed={elapsed:.2f}s")
+    print(f"throughput: {total / elapsed:.1f} attempts/s, {counts['booked'] / elapsed:.1f} bookings/s")
+    print(f"booked={counts['booked']} conflicts={counts['conflict']} errors={counts['error']} "
+          f"conflict_rate={counts['conflict'] / total:.1%}")
+    if latencies:
+        summary = summarize(latencies, elapsed)
+        print(f"latency: p50={summary['p50_ms']:.1f}ms p95={summary['p95_ms']:.1f}ms p99={summary['p99_ms']:.1f}ms")
+    print(f"overlapping active bookings: {overlaps}")
+    return overlaps == 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--rooms', type=int, default=4, help='number of hot rooms')
+    parser.add_argument('--attempts', type=int, default=50, help='booking attempts per client')
+    parser.add_argument('--horizon-days', type=int, default=60)
+    parser.add_argument('--max-nights', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    ok = run(args.clients, args.rooms, args.attempts, args.horizon_days, args.max_nights, args.seed)
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
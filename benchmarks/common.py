@@ -0,0 +1,57 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import math
+import subprocess
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, elapsed):
+    """Latency percentiles (ms) and throughput for a list of per-call seconds."""
+    values = sorted(latencies)
+    if not values:
+        return {'calls': 0}
+    return {
+        'calls': len(values),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+        'throughput_per_s': round(len(values) / elapsed, 1) if elapsed else None,
+    }
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=str)
+        f.write('\n')
+
+def print_comparison(current, baseline_path, metrics=('p50_ms', 'p95_ms', 'p99_ms')):
+    """Print per-function changes of the given metrics against an earlier results file."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('meta', {}).get('commit')}):")
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            print(f"  {name}: no baseline")
+            continue
+        changes = []
+        for metric in metrics:
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None:
+                changes.append(f"{metric} {old} -> {new} ({(new - old) / old:+.1%})")
+        print(f"  {name}: " + ', '.join(changes))
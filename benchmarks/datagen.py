@@ -0,0 +1,201 @@
+"""Seeded synthetic dataset generator for the benchmarks.
+
+Creates (or recreates) a scratch database, loads db.sql's schema, applies
+migrations and fills it with a reproducible dataset. Bookings of a room
+never overlap, past stays are Completed and future ones Pending/Confirmed.
+Every FREE_ROOM_EVERY-th room has only past stays, so it is free from today.
+
+    python -m benchmarks.datagen --database roomify_bench --scale 100k
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, timedelta
+import mysql.connector
+from backend.database import close_pool, get_engine, server_address, sqlite_path, transaction
+from backend.migrate import SCHEMA_FILE, load_schema, migrate, split_statements
+from backend.occupancy import rebuild_calendar
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+# Average and longest nights of a generated stay (1-7) plus the gap before the next (0-4)
+STAY_DAYS = 6
+MAX_STAY_DAYS = 11
+# Share of rooms (1 in N) whose stays all end before today
+FREE_ROOM_EVERY = 5
+
+# bcrypt hash of 'admin123', reused for every generated account
+PASSWORD_HASH = '$2b$12$LiCXw5KTYCiImn7GgzZ8OOZyG4iMLP.AS6SOIo0v/MJ92k9ht9OE2'
+
+CITIES = [
+    'Dhaka', 'Chittagong', 'Sylhet', 'Khulna', 'Rajshahi', 'Barisal', 'Rangpur', 'Comilla',
+    'New York', 'London', 'Paris', 'Berlin', 'Tokyo', 'Sydney', 'Toronto', 'Dubai',
+    'Singapore', 'Bangkok', 'Istanbul', 'Rome', 'Madrid', 'Lisbon', 'Vienna', 'Prague',
+    'Amsterdam', 'Dublin', 'Oslo', 'Helsinki', 'Warsaw', 'Athens',
+]
+AREAS = ['Central', 'Old Town', 'Riverside', 'Uptown', 'Harbour', 'University', 'Airport', 'Market']
+WORDS = (
+    'cozy bright spacious quiet modern rustic luxury budget studio apartment loft villa cottage '
+    'balcony garden terrace pool view lake river sea mountain city center station family'
+).split()
+
+def sizes(bookings):
+    """Row counts for each table at a given number of bookings."""
+    return {
+        'bookings': bookings,
+        'rooms': max(100, bookings // 10),
+        'users': max(50, bookings // 5),
+    }
+
+def server_connection():
+    host, port = server_address()
+    return mysql.connector.connect(
+        host=host,
+        port=port,
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+
+def use_database(database):
+    """Point DB_NAME, and on SQLite SQLITE_PATH, at the benchmark database."""
+    os.environ['DB_NAME'] = database
+    if get_engine() == 'sqlite':
+        # Always <database>.db, never an SQLITE_PATH meant for the app
+        os.environ['SQLITE_PATH'] = os.path.abspath(f"{database}.db")
+    close_pool()
+
+def is_generated(path):
+    """True if the SQLite file at path holds only accounts made by this module."""
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as connection:
+            count, = connection.execute(
+                "SELECT COUNT(*) FROM USER WHERE `e-mail` NOT LIKE '%@bench.local'").fetchone()
+    except sqlite3.Error:
+        return False
+    return count == 0
+
+def create_schema(database):
+    """Drop and recreate database, then load db.sql into it."""
+    if get_engine() == 'sqlite':
+        # use_database pointed SQLITE_PATH at this database's own file
+        path = sqlite_path()
+        if os.path.exists(path) and not is_generated(path):
+            raise ValueError(f"{path} was not created by benchmarks.datagen; "
+                             f"remove it or pick another --database")
+        close_pool()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        load_schema()
+        return
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    connection = server_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}`")
+        cursor.execute(f"USE `{database}`")
+        for statement in statements:
+            # db.sql targets airbnb_booking; the scratch database is selected above
+            if statement.upper().startswith(('CREATE DATABASE', 'USE ')):
+                continue
+            cursor.execute(statement)
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+def insert_chunks(tx, query, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        tx.execute_many(query, rows[start:start + chunk_size])
+
+def generate(scale_bookings, seed=42, today=None):
+    """Fill the configured database; returns the row counts written."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    counts = sizes(scale_bookings)
+
+    locations = []
+    for city_index, city in enumerate(CITIES):
+        for area_index, area in enumerate(AREAS):
+            locations.append((f'{city_index:02d}{area_index:02d}', city, area))
+
+    users = [(user_id, f'User {user_id}', f'user{user_id}@bench.local', f'+880{user_id:09d}', PASSWORD_HASH)
+             for user_id in range(1, counts['users'] + 1)]
+
+    rooms = []
+    for room_id in range(1, counts['rooms'] + 1):
+        description = ' '.join(rng.sample(WORDS, 6))
+        rooms.append((room_id, rng.randrange(20, 400), description, None, rng.choice(locations)[0], 1))
+
+    # Walk each room's calendar forward so its stays never overlap. A stay
+    # plus the gap after it averages STAY_DAYS, so starting half the walk
+    # back puts about half of every room's bookings in the past. Free rooms
+    # start far enough back that even their longest walk ends before today.
+    bookings, payments = [], []
+    per_room = scale_bookings // counts['rooms']
+    extra = scale_bookings % counts['rooms']
+    start_day = today - timedelta(days=(per_room + 1) * STAY_DAYS // 2)
+    free_start_day = today - timedelta(days=(per_room + 1) * MAX_STAY_DAYS + 14)
+    booking_id = 1
+    for room_id, price, *_ in rooms:
+        walk_start = free_start_day if room_id % FREE_ROOM_EVERY == 0 else start_day
+        day = walk_start + timedelta(days=rng.randrange(14))
+        for _ in range(per_room + (1 if room_id <= extra else 0)):
+            nights = rng.randint(1, 7)
+            check_in, check_out = day, day + timedelta(days=nights)
+            if check_out < today:
+                status = 'Cancelled' if rng.random() < 0.1 else 'Completed'
+            else:
+                status = rng.choice(['Pending', 'Confirmed', 'Confirmed', 'Cancelled'])
+            total = price * nights
+            bookings.append((booking_id, total, status, check_in, check_out, rng.randint(1, counts['users']), room_id))
+            payments.append((total, booking_id))
+            booking_id += 1
+            day = check_out + timedelta(days=rng.randrange(0, 5))
+
+    with transaction() as tx:
+        insert_chunks(tx, "INSERT INTO Location (Postal_code, city, area) VALUES (%s, %s, %s) "
+                          "ON DUPLICATE KEY UPDATE city=city", locations)
+        insert_chunks(tx, "INSERT INTO USER (user_id, name, `e-mail`, phone, password) VALUES (%s, %s, %s, %s, %s)", users)
+        insert_chunks(tx, "INSERT INTO Room (Room_id, price, description, image_url, Postal_code, admin_id) "
+                          "VALUES (%s, %s, %s, %s, %s, %s)", rooms)
+    # Large tables are committed in pieces to keep transactions reasonable
+    for start in range(0, len(bookings), 50_000):
+        with transaction() as tx:
+            insert_chunks(tx, "INSERT INTO Booking (booking_id, Total_cost, status, check_in_date, check_out_date, user_id, room_id) "
+                              "VALUES (%s, %s, %s, %s, %s, %s, %s)", bookings[start:start + 50_000])
+            insert_chunks(tx, "INSERT INTO Payment (amount, booking_id) VALUES (%s, %s)", payments[start:start + 50_000])
+
+    return {'locations': len(locations), **counts}
+
+def prepare(database, scale, seed=42, migrations=True):
+    """Create and populate a benchmark database; DB_NAME is pointed at it."""
+    use_database(database)
+    create_schema(database)
+    if migrations:
+        migrate()
+    counts = generate(SCALES[scale], seed=seed)
+    if migrations:
+        rebuild_calendar()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default='roomify_bench')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-migrations', action='store_true', help='load db.sql only, without the migration indexes')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    try:
+        counts = prepare(args.database, args.scale, args.seed, migrations=not args.no_migrations)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Generated {counts} into {args.database} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+"""Concurrent-session load test for the NiceGUI pages.
+
+Each simulated user speaks NiceGUI's HTTP + socket.io protocol like a
+browser tab and walks login -> browse -> search -> book. Reports
+per-page and per-event latency percentiles, error rates and the server's
+memory growth per session.
+
+Start against a running app (give --server-pid to sample its memory) or
+let the harness start main.py itself:
+
+    python -m benchmarks.load_test --start-server --sessions 200 --concurrency 50
+
+Accounts default to the generated ones from benchmarks.datagen
+(user<N>@bench.local / admin123); a started server uses --database.
+"""
+import argparse
+import ast
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode
+import httpx
+import socketio
+from benchmarks.common import summarize, write_json
+from benchmarks.datagen import CITIES, use_database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_ELEMENTS = re.compile(r'parseElements\(String\.raw`(.*?)`\)', re.S)
+_QUERY = re.compile(r'query: (\{.*?\}),\n', re.S)
+
+
+class FlowError(Exception):
+    """A step of the simulated user flow did not get the expected response."""
+
+
+def _parse_elements(raw):
+    # Mirrors parseElements() in nicegui.js
+    for entity, char in (('&#36;', '$'), ('&#96;', '`'), ('&gt;', '>'), ('&lt;', '<'), ('&amp;', '&')):
+        raw = raw.replace(entity, char)
+    return json.loads(raw)
+
+def _event_type(name):
+    return name.replace('-', '').replace(':', '').lower()
+
+
+class PageSession:
+    """One browser tab: loads a page over HTTP and talks to it over socket.io."""
+
+    def __init__(self, base_url, http, timeout):
+        self.base_url = base_url
+        self.http = http
+        self.timeout = timeout
+        self.elements = {}
+        self.client_id = None
+        self.messages = asyncio.Queue()
+        self.sio = None
+
+    async def open(self, path):
+        response = await self.http.get(self.base_url + path)
+        if response.status_code != 200:
+            raise FlowError(f"GET {path} returned {response.status_code}")
+        elements, query = _ELEMENTS.search(response.text), _QUERY.search(response.text)
+        if not elements or not query:
+            raise FlowError(f"GET {path} did not return a NiceGUI page")
+        self.elements = _parse_elements(elements.group(1))
+        query = ast.literal_eval(query.group(1))
+        self.client_id = query['client_id']
+        query.update(document_id=str(uuid.uuid4()), tab_id=str(uuid.uuid4()))
+        query = {key: (str(value).lower() if isinstance(value, bool) else value) for key, value in query.items()}
+
+        self.sio = socketio.AsyncClient(reconnection=False)
+        for kind in ('update', 'open', 'notify', 'run_javascript', 'download'):
+            self.sio.on(kind, self._handler(kind))
+        cookies = '; '.join(f'{name}={value}' for name, value in self.http.cookies.items())
+        await self.sio.connect(
+            f"{self.base_url}?{urlencode(query)}",
+            socketio_path='/_nicegui_ws/socket.io',
+            transports=['websocket'],
+            headers={'Cookie': cookies} if cookies else {},
+            wait_timeout=self.timeout,
+        )
+
+    async def close(self):
+        if self.sio is not None:
+            await self.sio.disconnect()
+            self.sio = None
+
+    def find(self, text=None, label=None, tag=None):
+        """Id of the first element with the given text, label prop or tag."""
+        for element_id, element in self.elements.items():
+            if element is None:
+                continue
+            if text is not None and element.get('text') != text and element.get('props', {}).get('label') != text:
+                continue
+            if label is not None and element.get('props', {}).get('label') != label:
+                continue
+            if tag is not None and element.get('tag') != tag:
+                continue
+            return element_id
+        raise FlowError(f"No element with text={text!r} label={label!r} tag={tag!r}")
+
+    async def emit(self, element_id, event_types, *args):
+        """Fire every listener of the element registered for one of event_types."""
+        wanted = {_event_type(name) for name in event_types}
+        listeners = [e for e in self.elements[element_id].get('events', []) if _event_type(e['type']) in wanted]
+        if not listeners:
+            raise FlowError(f"Element {element_id} has no {'/'.join(event_types)} listener")
+        self._drain()
+        for listener in listeners:
+            await self.sio.emit('event', {
+                'id': int(element_id),
+                'client_id': self.client_id,
+                'listener_id': listener['listener_id'],
+                'args': [json.dumps(arg) for arg in args],
+            })
+
+    async def set_value(self, element_id, value):
+        # The value binding plus any listeners the page added on the model value
+        await self.emit(element_id, ('update:value', 'update:modelValue'), value)
+
+    async def click(self, element_id):
+        await self.emit(element_id, ('click',))
+
+    async def wait_for(self, *kinds):
+        """Wait for the next message of one of the kinds; returns (kind, data).
+
+        Positive notifications are skipped so success toasts do not hide the
+        navigation that follows them.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FlowError(f"Timed out waiting for {'/'.join(kinds)}")
+            try:
+                kind, data = await asyncio.wait_for(self.messages.get(), remaining)
+            except asyncio.TimeoutError:
+                raise FlowError(f"Timed out waiting for {'/'.join(kinds)}") from None
+            if kind == 'notify' and data.get('type') == 'positive':
+                continue
+            if kind in kinds:
+                return kind, data
+
+    async def wait_for_element(self, text):
+        """Wait until an element with text shows up; a notification ends the wait early."""
+        while True:
+            try:
+                return 'update', self.find(text=text)
+            except FlowError:
+                pass
+            kind, data = await self.wait_for('update', 'notify')
+            if kind == 'notify':
+                return kind, data
+
+    async def wait_until(self, predicate, timeout):
+        """Wait until predicate() holds after an update; False if timeout passes first."""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self.messages.get(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def _handler(self, kind):
+        async def handle(data):
+            if kind == 'update':
+                for element_id, element in data.items():
+                    if element_id != '_id':
+                        self.elements[element_id] = element
+            await self.messages.put((kind, data))
+            # Acknowledge like the browser so the server can prune its message history
+            await self.sio.emit('ack', {'client_id': self.client_id, 'next_message_id': data['_id'] + 1})
+        return handle
+
+    def _drain(self):
+        while not self.messages.empty():
+            self.messages.get_nowait()
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.attempts = defaultdict(int)
+        self.errors = defaultdict(int)
+        # Sessions that ended early for legitimate reasons (nothing left to book)
+        self.skipped = defaultdict(int)
+        self.started = time.perf_counter()
+
+    async def measure(self, name, coro):
+        self.attempts[name] += 1
+        started = time.perf_counter()
+        try:
+            result = await coro
+        except Exception:
+            self.errors[name] += 1
+            raise
+        self.latencies[name].append(time.perf_counter() - started)
+        return result
+
+    def record(self, name, seconds):
+        self.attempts[name] += 1
+        self.latencies[name].append(seconds)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        report = {}
+        for name in sorted(self.attempts):
+            summary = summarize(self.latencies[name], elapsed)
+            summary['errors'] = self.errors[name]
+            summary['error_rate'] = round(self.errors[name] / self.attempts[name], 4)
+            report[name] = summary
+        return report
+
+
+def rooms_view(tab):
+    """(View Details buttons, whether the empty-state label shows) on the dashboard."""
+    cards, empty = [], False
+    for element_id, element in tab.elements.items():
+        if element is None:
+            continue
+        text = element.get('text', element.get('props', {}).get('label'))
+        if text == 'View Details':
+            cards.append(element_id)
+        elif text == 'No rooms available' and 'hidden' not in element.get('class', []):
+            empty = True
+    return cards, empty
+
+async def search(tab, element_id, text, args, recorder):
+    """Search the dashboard; returns the View Details buttons of the results.
+
+    The cards are patched by key, so a search whose results are already on
+    screen sends nothing back: after --settle seconds without a change the
+    page as shown is the answer, and it is left out of the latency figures.
+    """
+    before = rooms_view(tab)
+    await tab.set_value(element_id, text)
+    started = time.perf_counter()
+    if await tab.wait_until(lambda: rooms_view(tab) != before, args.settle):
+        recorder.record('event search', time.perf_counter() - started)
+    return rooms_view(tab)[0]
+
+async def user_flow(index, args, recorder):
+    """login -> browse -> search -> open a room -> book it."""
+    rng = random.Random(args.seed + index)
+    async with httpx.AsyncClient(timeout=args.timeout) as http:
+        tab = PageSession(args.url, http, args.timeout)
+        try:
+            # Login
+            await recorder.measure('page /', tab.open('/'))
+            email = args.email.format(n=rng.randint(1, args.users))
+            await tab.set_value(tab.find(label='Email'), email)
+            await tab.set_value(tab.find(label='Password'), args.password)
+            await tab.click(tab.find(text='Log In'))
+            kind, data = await recorder.measure('event login', tab.wait_for('open', 'notify'))
+            if kind != 'open':
+                recorder.errors['event login'] += 1
+                raise FlowError(f"Login failed for {email}: {data.get('message')}")
+            await tab.close()
+
+            # Browse
+            await recorder.measure('page /dashboard', tab.open('/dashboard'))
+            search_input = tab.find(label='Search by city or area')
+            cards = await search(tab, search_input, rng.choice(CITIES), args, recorder)
+            if not cards:
+                # Nothing free in that city: clear the search and book from the full list
+                cards = await search(tab, search_input, '', args, recorder)
+                if not cards:
+                    recorder.skipped['no_free_rooms'] += 1
+                    return
+            await tab.click(rng.choice(cards))
+            kind, data = await tab.wait_for('open')
+            room_path = data['path']
+            await tab.close()
+
+            # Book
+            await recorder.measure('page /room', tab.open(room_path))
+            check_in = date.today() + timedelta(days=rng.randint(30, 365))
+            await tab.set_value(tab.find(label='Check-in Date'), check_in.isoformat())
+            await tab.set_value(tab.find(label='Check-out Date'), (check_in + timedelta(days=rng.randint(1, 5))).isoformat())
+            await tab.click(tab.find(text='Book Now'))
+            kind, confirm = await recorder.measure('event book_now', tab.wait_for_element('Confirm & Pay'))
+            if kind == 'notify':
+                # Dates taken: a legitimate outcome under contention
+                recorder.skipped['dates_taken'] += 1
+                return
+            await tab.click(confirm)
+            kind, data = await recorder.measure('event confirm', tab.wait_for('open', 'notify'))
+            if kind != 'open':
+                recorder.errors['event confirm'] += 1
+                raise FlowError(f"Booking was not confirmed: {data.get('message')}")
+        finally:
+            await tab.close()
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and its descendants (Linux /proc)."""
+    children = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    parent = int(f.read().rsplit(')', 1)[1].split()[1])
+                children[parent].append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        stack.extend(children.get(current, []))
+    return total
+
+async def sample_memory(pid, samples, stop):
+    while not stop.is_set():
+        samples.append(process_tree_rss(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+async def wait_for_server(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as http:
+        while time.monotonic() < deadline:
+            try:
+                await http.get(url + '/')
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+async def run(args):
+    server = None
+    pid = args.server_pid
+    if args.start_server:
+        # The default accounts live in the generated database
+        use_database(args.database)
+        server = subprocess.Popen([sys.executable, 'main.py'], cwd=ROOT)
+        pid = server.pid
+    try:
+        await wait_for_server(args.url)
+        # Warm-up sessions start lazy server resources (e.g. the hashing
+        # processes) so they do not count as per-session growth
+        for index in range(args.warmup):
+            try:
+                await user_flow(-1 - index, args, Recorder())
+            except Exception as e:
+                print(f"warm-up session failed: {e}")
+        baseline = process_tree_rss(pid) if pid else None
+        samples, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(sample_memory(pid, samples, stop)) if pid else None
+
+        recorder = Recorder()
+        semaphore = asyncio.Semaphore(args.concurrency)
+        failures = defaultdict(int)
+
+        async def one(index):
+            async with semaphore:
+                try:
+                    await user_flow(index, args, recorder)
+                except Exception as e:
+                    failures[type(e).__name__] += 1
+                    if args.verbose:
+                        print(f"session {index}: {e}")
+
+        await asyncio.gather(*(one(i) for i in range(args.sessions)))
+        stop.set()
+        if sampler:
+            await sampler
+
+        report = {
+            'sessions': args.sessions,
+            'concurrency': args.concurrency,
+            'failed_sessions': dict(failures),
+            'skipped_sessions': dict(recorder.skipped),
+            'latency': recorder.report(),
+        }
+        if pid:
+            peak, final = max(samples, default=baseline), process_tree_rss(pid)
+            report['memory'] = {
+                'baseline_mb': round(baseline / 2**20, 1),
+                'peak_mb': round(peak / 2**20, 1),
+                'final_mb': round(final / 2**20, 1),
+                # Live sessions vs. what is still held once they have all disconnected
+                'growth_per_concurrent_session_kb': round((peak - baseline) / 1024 / min(args.concurrency, args.sessions), 1),
+                'retained_per_session_kb': round((final - baseline) / 1024 / args.sessions, 1),
+            }
+        return report
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--start-server', action='store_true', help='run main.py for the duration of the test')
+    parser.add_argument('--database', default='roomify_bench', help='database the started server uses')
+    parser.add_argument('--server-pid', type=int, help='pid of an already running server, for memory sampling')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1, help='unrecorded sessions run before the memory baseline')
+    parser.add_argument('--users', type=int, default=200, help='number of accounts to pick from')
+    parser.add_argument('--email', default='user{n}@bench.local')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--timeout', type=float, default=15.0)
+    parser.add_argument('--settle', type=float, default=3.0, help='seconds to wait for a search that may not change the page')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true', help='print why each failed session failed')
+    parser.add_argument('--output', help='write the report to this JSON file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    for name, r in report['latency'].items():
+        if r['calls']:
+            print(f"{name:18s} p50={r['p50_ms']:>8.1f}ms p95={r['p95_ms']:>8.1f}ms p99={r['p99_ms']:>8.1f}ms "
+                  f"n={r['calls']:<5d} errors={r['error_rate']:.1%}")
+        else:
+            print(f"{name:18s} errors={r['errors']}")
+    print(f"failed sessions: {report['failed_sessions'] or 0}, skipped: {report['skipped_sessions'] or 0}")
+    if 'memory' in report:
+        print(f"memory: {report['memory']}")
+    if args.output:
+        write_json(args.output, report)
+
+if __name__ == '__main__':
+    main()
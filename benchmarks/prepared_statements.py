@@ -0,0 +1,107 @@
+"""Text protocol vs prepared statements for the registered hot queries.
+
+Runs each named query the same number of times as a plain statement
+(parsed by the server on every call) and through the prepared-statement
+registry (parsed once per pooled connection), then prints both latencies
+and the registry's per-query statistics:
+
+    python -m benchmarks.prepared_statements --scale 100k --generate
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from backend import auth, bookings, rooms  # noqa: F401 - importing registers their queries
+from backend.database import (execute_named_read_query, execute_read_query, get_engine,
+                              get_named_query, query_stats, reset_query_stats)
+from benchmarks.backend_suite import run_case
+from benchmarks.common import git_commit, print_comparison, write_json
+from benchmarks.datagen import SCALES, prepare, sizes, use_database
+
+def build_cases(rng, counts, today):
+    """Map named query -> callable producing its parameters."""
+    def stay():
+        check_in = today + timedelta(days=rng.randint(1, 90))
+        return check_in, check_in + timedelta(days=rng.randint(1, 7))
+
+    def conflicts():
+        check_in, check_out = stay()
+        return rng.randint(1, counts['rooms']), check_out, check_in
+
+    return {
+        'room_details': lambda: (rng.randint(1, counts['rooms']),),
+        'room_conflicts': conflicts,
+        'user_bookings': lambda: (rng.randint(1, counts['users']),),
+        'available_rooms_after': lambda: (rng.randint(0, counts['rooms']), 25),
+        'find_accounts': lambda: (f"user{rng.randint(1, counts['users'])}@bench.local",) * 2,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default='roomify_bench')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--generate', action='store_true', help='(re)create and populate the database first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=2000, help='calls per query and mode')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    use_database(args.database)
+    os.environ.setdefault('DB_POOL_SIZE', str(max(5, args.threads)))
+    if args.generate:
+        started = time.perf_counter()
+        try:
+            prepare(args.database, args.scale, args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Generated {args.scale} dataset in {time.perf_counter() - started:.1f}s")
+
+    counts = sizes(SCALES[args.scale])
+    results = {}
+    print(f"{'query':16s} {'text p50':>10s} {'prepared p50':>13s} {'text mean':>10s} {'prepared mean':>14s}  saving")
+    for name, params in build_cases(random.Random(args.seed), counts, date.today()).items():
+        query = get_named_query(name)
+        text = run_case(lambda: execute_read_query(query, params()), args.iterations, args.threads, args.warmup)
+        prepared = run_case(lambda: execute_named_read_query(name, params()), args.iterations, args.threads, args.warmup)
+        results[f"{name}_text"] = text
+        results[f"{name}_prepared"] = prepared
+        if text['failures'] or prepared['failures']:
+            print(f"{name:16s} failed: text {text['failure_rate']:.1%}, prepared {prepared['failure_rate']:.1%}")
+            continue
+        saving = 1 - prepared['mean_ms'] / text['mean_ms'] if text['mean_ms'] else 0
+        print(f"{name:16s} {text['p50_ms']:>8.3f}ms {prepared['p50_ms']:>11.3f}ms "
+              f"{text['mean_ms']:>8.3f}ms {prepared['mean_ms']:>12.3f}ms  {saving:+.1%}")
+
+    print("\nRegistry statistics (includes warm-up calls):")
+    stats = query_stats()
+    for name, entry in sorted(stats.items()):
+        print(f"  {name:16s} calls={entry['calls']:<7d} prepares={entry['prepares']:<3d} "
+              f"errors={entry['errors']:<3d} mean={entry['mean_ms']}ms")
+    reset_query_stats()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'engine': get_engine(),
+            'scale': args.scale,
+            'threads': args.threads,
+        },
+        'results': results,
+        'query_stats': stats,
+    }
+    if args.output:
+        write_json(args.output, report)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        print_comparison(report, args.compare)
+    if any(r['failures'] for r in results.values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Keyed, diff-based updates for lists shown in the UI.
+
+Rather than clearing a container and rebuilding every child, callers pass
+the list they want to show. Items are matched by key and only the added,
+removed or changed ones are touched, so an interaction sends just those
+elements over the websocket.
+"""
+import json
+
+
+class KeyedCards:
+    """One rendered element per item key inside a container, patched in place.
+
+    render(item) must create the element inside the current context and
+    return it. An item is re-rendered only when it no longer compares equal
+    to the item its element was rendered from.
+    """
+
+    def __init__(self, container, key, render):
+        self.container = container
+        self.key = key
+        self.render = render
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sync(self, items):
+        """Show exactly items, in their order."""
+        wanted = {item[self.key]: item for item in items}
+        for key in [key for key in self._entries if key not in wanted]:
+            self._entries.pop(key)[0].delete()
+        for item in wanted.values():
+            self._put(item)
+        self._entries = {key: self._entries[key] for key in wanted}
+        self._reorder()
+
+    def clear(self):
+        self.sync([])
+
+    def _put(self, item):
+        key = item[self.key]
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] == item:
+            return
+        if entry is not None:
+            entry[0].delete()
+        with self.container:
+            element = self.render(item)
+        # Replacing a value keeps the key's place in the dict, and so on screen
+        self._entries[key] = (element, item)
+
+    def _reorder(self):
+        elements = [element for element, _ in self._entries.values()]
+        children = self.container.default_slot.children
+        if children != elements:
+            children[:] = elements
+            self.container.update()
+
+
+def sync_rows(table, rows):
+    """Make table.rows equal rows, keyed by the table's row_key.
+
+    The table element is kept (no re-mount, slots or columns resent) and
+    nothing is sent when the rows did not change. Selected rows that are
+    gone are deselected. Returns whether anything changed.
+    """
+    key = table.row_key
+    if table.rows == rows:
+        return False
+    keys = {row[key] for row in rows}
+    table.rows[:] = rows
+    table.selected[:] = [row for row in table.selected if row[key] in keys]
+    table.update()
+    return True
+
+
+def patch_rows(table, changes, clear_selection=False):
+    """Apply {row key: {field: value}} to table rows, sending only the changes.
+
+    table.update() resends every row, so the server's rows are changed with
+    updates suspended and the browser's copy is patched the same way.
+    """
+    key = table.row_key
+    with table.props.suspend_updates():
+        for row in table.rows:
+            change = changes.get(row[key])
+            if change:
+                row.update(change)
+        if clear_selection:
+            table.selected.clear()
+    table.client.run_javascript(f"""
+        const props = mounted_app.elements[{table.id}].props;
+        const changes = {json.dumps({str(row_key): change for row_key, change in changes.items()})};
+        for (const row of props.rows) {{
+            const change = changes[row[{json.dumps(key)}]];
+            if (change) Object.assign(row, change);
+        }}
+        {'props.selected.splice(0);' if clear_selection else ''}
+    """)
+
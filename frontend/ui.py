@@ -1,15 +1,37 @@
 from nicegui import ui, app
 from backend.auth import login_user, register_user
 from backend.rooms import (
-    get_all_available_rooms, search_rooms, get_room_details, 
+    get_available_rooms_page, search_rooms, get_room_details, 
     is_room_available, get_all_rooms, get_all_locations,
-    create_room, update_room, delete_room
+    create_room, update_room, delete_room, room_cache
 )
 from backend.bookings import (
-    create_booking, get_user_bookings, get_all_bookings,
-    update_booking_status, calculate_total_cost
+    create_booking, get_user_bookings, get_bookings_page,
+    update_booking_status, update_booking_statuses, calculate_total_cost
 )
+from backend.async_database import run_db, set_session_source
+from backend.database import get_pool, get_replica_pools
+from backend.metrics import metrics
+from backend.export import EXPORT_FORMATS
+from backend.images import store_dir, variant_url
+from backend.occupancy import booked_nights, stay_nights
+from backend.pricing import quote_rooms
+from backend.room_import import parse_rooms_file, import_rooms
+from frontend.keyed import KeyedCards, patch_rows, sync_rows
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from datetime import datetime, timedelta
+import csv
+import os
+
+# Variant files are named by content hash, so browsers may keep them for a year
+IMAGE_CACHE_AGE = 365 * 24 * 3600
+ROOM_PAGE_SIZE = 24
+# Pages of room cards kept on the dashboard; older ones are dropped and refetched on the way back
+ROOM_WINDOW_PAGES = 4
+# A search shows at most this many of its best matches
+SEARCH_RESULT_LIMIT = 10 * ROOM_PAGE_SIZE
+BOOKING_PAGE_SIZE = 50
+IMPORT_CHUNK_SIZE = 1000
 
 # Helper function to check if user is logged in
 def require_login():
@@ -19,6 +41,13 @@ def require_login():
         return None
     return app.storage.user['user']
 
+def browser_session():
+    """Id of the current browser, used to route its reads after it writes."""
+    try:
+        return app.storage.browser.get('id')
+    except RuntimeError:
+        return None
+
 def require_admin():
     """Check if user is admin, redirect if not."""
     user = require_login()
@@ -27,7 +56,18 @@ def require_admin():
         return None
     return user
 
+def room_image_src(room, variant):
+    """Resized variant of a room's image once processed, else the original URL."""
+    if room.get('image_key'):
+        return variant_url(room['image_key'], variant)
+    return room['image_url']
+
 def create_pages():
+    set_session_source(browser_session)
+    
+    # ==================== ROOM IMAGES ====================
+    os.makedirs(store_dir(), exist_ok=True)
+    app.add_static_files('/images', store_dir(), max_cache_age=IMAGE_CACHE_AGE)
     
     # ==================== LOGIN / SIGNUP PAGE ====================
     @ui.page('/')
@@ -50,8 +90,8 @@ def create_pages():
                         email = ui.input('Email').classes('w-full mb-2')
                         password = ui.input('Password', password=True, password_toggle_button=True).classes('w-full mb-4')
                         
-                        def try_login():
-                            user, message = login_user(email.value, password.value)
+                        async def try_login():
+                            user, message = await login_user(email.value, password.value)
                             if user:
                                 ui.notify(message, type='positive')
                                 app.storage.user['user'] = user
@@ -73,12 +113,12 @@ def create_pages():
                         reg_phone = ui.input('Phone').classes('w-full mb-2')
                         reg_pass = ui.input('Password', password=True, password_toggle_button=True).classes('w-full mb-4')
 
-                        def try_register():
+                        async def try_register():
                             if not all([reg_name.value, reg_email.value, reg_phone.value, reg_pass.value]):
                                 ui.notify('Please fill all fields', type='warning')
                                 return
                             
-                            success, message = register_user(reg_name.value, reg_email.value, reg_phone.value, reg_pass.value)
+                            success, message = await register_user(reg_name.value, reg_email.value, reg_phone.value, reg_pass.value)
                             if success:
                                 ui.notify(message, type='positive')
                                 tabs.set_value(login_tab)
@@ -89,7 +129,7 @@ def create_pages():
 
     # ==================== USER DASHBOARD ====================
     @ui.page('/dashboard')
-    def dashboard():
+    async def dashboard():
         user = require_login()
         if not user:
             return
@@ -108,47 +148,138 @@ def create_pages():
             # Search bar
             with ui.row().classes('w-full gap-2 mb-4'):
                 search_input = ui.input('Search by city or area').classes('flex-grow')
-                ui.button('Search', on_click=lambda: load_rooms(search_input.value)).classes('bg-blue-600 text-white')
+                search_check_in = ui.input('Check-in').props('type=date clearable')
+                search_check_out = ui.input('Check-out').props('type=date clearable')
+                ui.button('Search', on_click=lambda: run_search()).classes('bg-blue-600 text-white')
             
-            # Room cards container
-            rooms_container = ui.column().classes('w-full')
+            # Room cards container: a window of ROOM_WINDOW_PAGES pages that
+            # moves as the user scrolls, so the page never holds every card
+            def on_rooms_scroll(e):
+                if e.vertical_percentage > 0.9:
+                    return load_more_rooms()
+                if e.vertical_percentage < 0.1:
+                    return load_earlier_rooms()
             
-            def load_rooms(search_query=None):
-                rooms_container.clear()
-                
-                if search_query:
-                    rooms = search_rooms(search_query)
+            with ui.scroll_area(on_scroll=on_rooms_scroll).classes('w-full h-[75vh]'):
+                earlier_button = ui.button('Show earlier rooms', on_click=lambda: load_earlier_rooms()).classes('w-full mb-2')
+                earlier_button.set_visibility(False)
+                rooms_container = ui.row().classes('w-full flex-wrap gap-4')
+            no_rooms_label = ui.label('No rooms available').classes('text-gray-500 text-center')
+            no_rooms_label.set_visibility(False)
+            load_more_button = ui.button('Load more', on_click=lambda: load_more_rooms()).classes('w-full mt-2')
+            
+            # pages: (cursor, rooms) on screen; earlier: cursors of the pages dropped above them
+            state = {'search_id': 0, 'fetch': None, 'cursor': None, 'done': True, 'loading': False,
+                     'pages': [], 'earlier': []}
+            
+            def render_room_card(room):
+                with ui.card().classes('w-80 cursor-pointer hover:shadow-xl transition-shadow') as card:
+                    # Room image
+                    if room.get('image_url'):
+                        ui.image(room_image_src(room, 'thumb')).props('loading=lazy').classes('w-full h-48 object-cover')
+                    else:
+                        ui.label('📷 No Image').classes('w-full h-48 flex items-center justify-center text-4xl bg-gray-200')
+                    
+                    with ui.column().classes('p-4'):
+                        ui.label(f"{room.get('city', 'Unknown')}, {room.get('area', '')}").classes('font-bold text-lg')
+                        ui.label(room.get('description', 'No description')[:100]).classes('text-gray-600 text-sm')
+                        ui.label(f"TK {room['price']}/night").classes('text-blue-600 font-bold text-xl mt-2')
+                        if room.get('stay_total') is not None:
+                            ui.label(f"TK {room['stay_total']:.2f} for {room['stay_nights']} night(s)").classes('text-gray-700 font-semibold')
+                        ui.button('View Details', on_click=lambda r=room: ui.navigate.to(f'/room/{r["Room_id"]}')).classes('w-full bg-blue-600 text-white mt-2')
+                return card
+            
+            # Cards are keyed by Room_id: a new search only adds, removes and reorders cards
+            room_cards = KeyedCards(rooms_container, 'Room_id', render_room_card)
+            
+            async def fetch_page(cursor):
+                """(rooms, next cursor), or None if a newer search started meanwhile."""
+                state['loading'] = True
+                search_id = state['search_id']
+                try:
+                    rooms, next_cursor = await state['fetch'](cursor)
+                finally:
+                    state['loading'] = False
+                if search_id != state['search_id']:
+                    return None
+                return rooms or [], next_cursor
+            
+            def show_pages():
+                room_cards.sync([room for _, rooms in state['pages'] for room in rooms])
+                earlier_button.set_visibility(bool(state['earlier']))
+                load_more_button.set_visibility(not state['done'])
+                no_rooms_label.set_visibility(not len(room_cards))
+            
+            async def load_more_rooms(replace=False):
+                if state['loading'] or state['done']:
+                    return
+                cursor = state['cursor']
+                page = await fetch_page(cursor)
+                if page is None:
+                    return
+                rooms, state['cursor'] = page
+                state['done'] = state['cursor'] is None
+                if replace:
+                    state['pages'], state['earlier'] = [], []
+                state['pages'].append((cursor, rooms))
+                if len(state['pages']) > ROOM_WINDOW_PAGES:
+                    state['earlier'].append(state['pages'].pop(0)[0])
+                show_pages()
+            
+            async def load_earlier_rooms():
+                if state['loading'] or not state['earlier']:
+                    return
+                cursor = state['earlier'][-1]
+                page = await fetch_page(cursor)
+                if page is None:
+                    return
+                state['earlier'].pop()
+                state['pages'].insert(0, (cursor, page[0]))
+                if len(state['pages']) > ROOM_WINDOW_PAGES:
+                    # Scrolling down again refetches the page dropped below
+                    state['cursor'] = state['pages'].pop()[0]
+                    state['done'] = False
+                show_pages()
+            
+            async def load_rooms(search_query=None, check_in=None, check_out=None):
+                state['search_id'] += 1
+                search_id = state['search_id']
+                if search_query or (check_in and check_out):
+                    # Search results arrive ranked in one piece and are shown a page at a time
+                    results = await run_db(search_rooms, search_query, check_in, check_out, SEARCH_RESULT_LIMIT) or []
+                    if check_in and check_out:
+                        # Every result is quoted for the stay in one vectorized pass
+                        results = await run_db(quote_rooms, results, check_in, check_out)
+                    if search_id != state['search_id']:
+                        return
+                    
+                    async def fetch(offset):
+                        offset = offset or 0
+                        end = offset + ROOM_PAGE_SIZE
+                        return results[offset:end], (end if end < len(results) else None)
                 else:
-                    rooms = get_all_available_rooms()
+                    async def fetch(after_room_id):
+                        return await run_db(get_available_rooms_page, after_room_id, ROOM_PAGE_SIZE)
                 
-                if not rooms:
-                    with rooms_container:
-                        ui.label('No rooms available').classes('text-gray-500 text-center')
+                state.update(fetch=fetch, cursor=None, done=False, loading=False)
+                await load_more_rooms(replace=True)
+            
+            async def run_search():
+                check_in, check_out = search_check_in.value, search_check_out.value
+                if check_in and check_out and check_in >= check_out:
+                    ui.notify('Check-out date must be after check-in date', type='warning')
                     return
-                
-                with rooms_container:
-                    with ui.row().classes('w-full flex-wrap gap-4'):
-                        for room in rooms:
-                            with ui.card().classes('w-80 cursor-pointer hover:shadow-xl transition-shadow'):
-                                # Room image
-                                if room.get('image_url'):
-                                    ui.image(room['image_url']).classes('w-full h-48 object-cover')
-                                else:
-                                    ui.label('📷 No Image').classes('w-full h-48 flex items-center justify-center text-4xl bg-gray-200')
-                                
-                                with ui.column().classes('p-4'):
-                                    ui.label(f"{room.get('city', 'Unknown')}, {room.get('area', '')}").classes('font-bold text-lg')
-                                    ui.label(room.get('description', 'No description')[:100]).classes('text-gray-600 text-sm')
-                                    ui.label(f"TK {room['price']}/night").classes('text-blue-600 font-bold text-xl mt-2')
-                                    ui.button('View Details', on_click=lambda r=room: ui.navigate.to(f'/room/{r["Room_id"]}')).classes('w-full bg-blue-600 text-white mt-2')
+                await load_rooms(search_input.value, check_in, check_out)
             
-            search_input.on('keydown.enter', lambda: load_rooms(search_input.value))
-            search_input.on('change', lambda: load_rooms(search_input.value))
-            load_rooms()
+            search_input.on('keydown.enter', run_search)
+            search_input.on('update:model-value', run_search, throttle=0.3, leading_events=False)
+            search_check_in.on('change', run_search)
+            search_check_out.on('change', run_search)
+            await load_rooms()
 
     # ==================== ROOM DETAILS & BOOKING ====================
     @ui.page('/room/{room_id}')
-    def room_details(room_id: int):
+    async def room_details(room_id: int):
         user = require_login()
         if not user:
             return
@@ -156,7 +287,7 @@ def create_pages():
             ui.navigate.to('/admin')
             return
 
-        room = get_room_details(room_id)
+        room = await run_db(get_room_details, room_id)
         if not room:
             ui.label('Room not found').classes('text-red-600')
             return
@@ -166,7 +297,7 @@ def create_pages():
             
             # Room Image
             if room.get('image_url'):
-                ui.image(room['image_url']).classes('w-full h-96 object-cover rounded-lg')
+                ui.image(room_image_src(room, 'detail')).classes('w-full h-96 object-cover rounded-lg')
             else:
                 ui.label('📷 No Image Available').classes('w-full h-96 flex items-center justify-center text-6xl bg-gray-200 rounded-lg')
             
@@ -181,10 +312,43 @@ def create_pages():
             tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
             day_after = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
             
-            check_in_input = ui.input('Check-in Date', value=tomorrow).props('type=date')
-            check_out_input = ui.input('Check-out Date', value=day_after).props('type=date')
+            # Taken nights for the next year come from the occupancy calendar in one query
+            taken = {night.isoformat() for night in await run_db(booked_nights, room_id) or []}
+            
+            def taken_between(check_in, check_out):
+                try:
+                    nights = stay_nights(check_in, check_out)
+                except (TypeError, ValueError):
+                    return []
+                return [night.isoformat() for night in nights if night.isoformat() in taken]
+            
+            def select_nights(e):
+                # The calendar selects nights; check-out is the morning after the last one
+                nights = {'from': e.value, 'to': e.value} if isinstance(e.value, str) else e.value
+                if not nights:
+                    return
+                check_in_input.value = nights['from']
+                check_out_input.value = (datetime.strptime(nights['to'], '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            
+            def show_taken_nights():
+                clash = taken_between(check_in_input.value, check_out_input.value)
+                taken_label.set_text(f"Already booked: {', '.join(clash)}" if clash else '')
+                taken_label.set_visibility(bool(clash))
+            
+            with ui.row().classes('gap-8 items-start'):
+                calendar = ui.date({'from': tomorrow, 'to': tomorrow}, on_change=select_nights).props('range')
+                # QDate passes option dates as YYYY/MM/DD
+                blocked = ', '.join(f"'{night.replace('-', '/')}'" for night in sorted(taken))
+                today = datetime.now().strftime('%Y/%m/%d')
+                calendar.props[':options'] = f"date => date >= '{today}' && ![{blocked}].includes(date)"
+                with ui.column():
+                    check_in_input = ui.input('Check-in Date', value=tomorrow, on_change=show_taken_nights).props('type=date')
+                    check_out_input = ui.input('Check-out Date', value=day_after, on_change=show_taken_nights).props('type=date')
+                    ui.label('Greyed-out nights are already booked').classes('text-sm text-gray-500')
+                    taken_label = ui.label().classes('text-red-600')
+                    taken_label.set_visibility(False)
             
-            def show_payment_popup():
+            async def show_payment_popup():
                 check_in = check_in_input.value
                 check_out = check_out_input.value
                 
@@ -196,12 +360,16 @@ def create_pages():
                     ui.notify('Check-out date must be after check-in date', type='warning')
                     return
                 
+                if taken_between(check_in, check_out):
+                    ui.notify('Room is not available for selected dates', type='negative')
+                    return
+                
                 # Check availability
-                if not is_room_available(room_id, check_in, check_out):
+                if not await run_db(is_room_available, room_id, check_in, check_out):
                     ui.notify('Room is not available for selected dates', type='negative')
                     return
                 
-                total_cost, num_nights = calculate_total_cost(room['price'], check_in, check_out)
+                total_cost, num_nights = await run_db(calculate_total_cost, room['price'], check_in, check_out, room_id)
                 
                 with ui.dialog() as dialog, ui.card().classes('p-6'):
                     ui.label('Confirm Payment').classes('text-2xl font-bold mb-4')
@@ -211,9 +379,9 @@ def create_pages():
                     ui.label(f'Nights: {num_nights}').classes('mb-2')
                     ui.label(f'Total Cost: TK {total_cost:.2f}').classes('text-2xl font-bold text-blue-600 mb-4')
                     
-                    def confirm_booking():
-                        success, message, booking_id = create_booking(
-                            user['user_id'], room_id, check_in, check_out, room['price']
+                    async def confirm_booking():
+                        success, message, booking_id = await run_db(
+                            create_booking, user['user_id'], room_id, check_in, check_out, room['price']
                         )
                         if success:
                             ui.notify(message, type='positive')
@@ -232,7 +400,7 @@ def create_pages():
 
     # ==================== MY BOOKINGS ====================
     @ui.page('/my-bookings')
-    def my_bookings():
+    async def my_bookings():
         user = require_login()
         if not user:
             return
@@ -245,7 +413,7 @@ def create_pages():
                 ui.label('My Bookings').classes('text-3xl font-bold')
                 ui.button('← Back to Dashboard', on_click=lambda: ui.navigate.to('/dashboard')).classes('bg-blue-500 text-white')
             
-            bookings = get_user_bookings(user['user_id'])
+            bookings = await run_db(get_user_bookings, user['user_id'])
             
             if not bookings:
                 ui.label('No bookings yet').classes('text-gray-500 text-center mt-8')
@@ -270,7 +438,7 @@ def create_pages():
 
     # ==================== ADMIN DASHBOARD ====================
     @ui.page('/admin')
-    def admin_dashboard():
+    async def admin_dashboard():
         user = require_admin()
         if not user:
             return
@@ -288,160 +456,297 @@ def create_pages():
                 
                 # ========== MANAGE ROOMS TAB ==========
                 with ui.tab_panel(rooms_tab):
-                    rooms_container = ui.column().classes('w-full')
-                    
-                    def load_admin_rooms():
-                        rooms_container.clear()
-                        
-                        with rooms_container:
-                            # Add Room Button
-                            def show_add_room_dialog():
-                                with ui.dialog() as dialog, ui.card().classes('p-6 w-96'):
-                                    ui.label('Add New Room').classes('text-2xl font-bold mb-4')
-                                    
-                                    price_input = ui.input('Price per Night').props('type=number')
-                                    desc_input = ui.textarea('Description')
-                                    image_input = ui.input('Image URL')
-                                    
-                                    locations = get_all_locations()
-                                    # map Postal_code -> "City, Area" so select.value returns Postal_code
-                                    location_options = {loc['Postal_code']: f"{loc['city']}, {loc['area']}" for loc in locations}
-                                    location_select = ui.select(location_options, label='Location')
-                                    
-                                    def add_room():
-                                        if not all([price_input.value, desc_input.value, location_select.value]):
-                                            ui.notify('Please fill all required fields', type='warning')
-                                            return
-                                        
-                                        try:
-                                            price = float(price_input.value)
-                                        except ValueError:
-                                            ui.notify('Invalid price format', type='warning')
-                                            return
-                                            
-                                        # Use admin_id from user session, ensuring it exists
-                                        admin_id = user.get('admin_id')
-                                        if not admin_id:
-                                            ui.notify('Admin session invalid. Please relogin.', type='negative')
-                                            return
-                                        
-                                        print(f"DEBUG UI: location_select.value = '{location_select.value}' (type: {type(location_select.value)})")
-                                        
-                                        try:
-                                            # Determine Postal_code robustly. NiceGUI's select may return
-                                            # either the option key or the option label depending on config.
-                                            selected = location_select.value
-                                            # location_options maps Postal_code -> "City, Area"
-                                            if selected in location_options:
-                                                postal_code = selected
-                                            else:
-                                                # reverse lookup: label -> Postal_code
-                                                inv = {v: k for k, v in location_options.items()}
-                                                postal_code = inv.get(selected, selected)
-
-                                            success, message = create_room(
-                                                price,
-                                                desc_input.value,
-                                                image_input.value if image_input.value else None,
-                                                postal_code,
-                                                admin_id
-                                            )
-                                            ui.notify(message, type='positive' if success else 'negative')
-                                            if success:
-                                                dialog.close()
-                                                load_admin_rooms()
-                                        except Exception as e:
-                                            ui.notify(f'Error creating room: {str(e)}', type='negative')
-                                    
-                                    with ui.row():
-                                        ui.button('Add Room', on_click=add_room).classes('bg-green-600 text-white')
-                                        ui.button('Cancel', on_click=dialog.close).classes('bg-gray-500 text-white')
-                                
-                                dialog.open()
+                    # Add Room Button
+                    async def show_add_room_dialog():
+                        with ui.dialog() as dialog, ui.card().classes('p-6 w-96'):
+                            ui.label('Add New Room').classes('text-2xl font-bold mb-4')
                             
-                            ui.button('+ Add New Room', on_click=show_add_room_dialog).classes('bg-green-600 text-white mb-4')
+                            price_input = ui.input('Price per Night').props('type=number')
+                            desc_input = ui.textarea('Description')
+                            image_input = ui.input('Image URL')
                             
-                            # Rooms Table
-                            rooms = get_all_rooms()
+                            locations = await run_db(get_all_locations) or []
+                            # map Postal_code -> "City, Area" so select.value returns Postal_code
+                            location_options = {loc['Postal_code']: f"{loc['city']}, {loc['area']}" for loc in locations}
+                            location_select = ui.select(location_options, label='Location')
                             
-                            if not rooms:
-                                ui.label('No rooms available').classes('text-gray-500')
-                            else:
-                                columns = [
-                                    {'name': 'id', 'label': 'ID', 'field': 'Room_id'},
-                                    {'name': 'location', 'label': 'Location', 'field': 'city'},
-                                    {'name': 'price', 'label': 'Price', 'field': 'price'},
-                                    {'name': 'description', 'label': 'Description', 'field': 'description'},
-                                    {'name': 'actions', 'label': 'Actions', 'field': 'actions'}
-                                ]
+                            async def add_room():
+                                if not all([price_input.value, desc_input.value, location_select.value]):
+                                    ui.notify('Please fill all required fields', type='warning')
+                                    return
                                 
-                                rows = []
-                                for r in rooms:
-                                    # Convert Decimal to float/string for safety
-                                    r_safe = r.copy()
-                                    if 'price' in r_safe:
-                                        r_safe['price'] = float(r_safe['price'])
+                                try:
+                                    price = float(price_input.value)
+                                except ValueError:
+                                    ui.notify('Invalid price format', type='warning')
+                                    return
                                     
-                                    rows.append({
-                                        'Room_id': r['Room_id'],
-                                        'city': f"{r.get('city', '')}, {r.get('area', '')}",
-                                        'price': f"TK {r['price']}",
-                                        'description': r.get('description', '')[:50] + '...' if r.get('description') else '',
-                                        'actions': '',
-                                        '_data': r_safe
-                                    })
+                                # Use admin_id from user session, ensuring it exists
+                                admin_id = user.get('admin_id')
+                                if not admin_id:
+                                    ui.notify('Admin session invalid. Please relogin.', type='negative')
+                                    return
                                 
-                                table = ui.table(columns=columns, rows=rows, row_key='Room_id').classes('w-full')
+                                print(f"DEBUG UI: location_select.value = '{location_select.value}' (type: {type(location_select.value)})")
                                 
-                                def delete_room_action(evt):
-                                    row = evt.args
-                                    success, message = delete_room(row['Room_id'])
+                                try:
+                                    # Determine Postal_code robustly. NiceGUI's select may return
+                                    # either the option key or the option label depending on config.
+                                    selected = location_select.value
+                                    # location_options maps Postal_code -> "City, Area"
+                                    if selected in location_options:
+                                        postal_code = selected
+                                    else:
+                                        # reverse lookup: label -> Postal_code
+                                        inv = {v: k for k, v in location_options.items()}
+                                        postal_code = inv.get(selected, selected)
+
+                                    success, message = await run_db(
+                                        create_room,
+                                        price,
+                                        desc_input.value,
+                                        image_input.value if image_input.value else None,
+                                        postal_code,
+                                        admin_id
+                                    )
                                     ui.notify(message, type='positive' if success else 'negative')
                                     if success:
-                                        load_admin_rooms()
+                                        dialog.close()
+                                        await load_admin_rooms()
+                                except Exception as e:
+                                    ui.notify(f'Error creating room: {str(e)}', type='negative')
+                            
+                            with ui.row():
+                                ui.button('Add Room', on_click=add_room).classes('bg-green-600 text-white')
+                                ui.button('Cancel', on_click=dialog.close).classes('bg-gray-500 text-white')
+                        
+                        dialog.open()
+                    
+                    def show_import_dialog():
+                        import_state = {'processed': 0, 'total': 0, 'imported': 0}
+                        
+                        async def refresh_if_imported():
+                            if import_state['imported']:
+                                await load_admin_rooms()
+                        
+                        with ui.dialog().on('hide', refresh_if_imported) as dialog, ui.card().classes('p-6 w-[32rem]'):
+                            ui.label('Import Rooms').classes('text-2xl font-bold mb-2')
+                            ui.label('CSV or JSON with price, description, image_url, postal_code, city, area. '
+                                     'City and area are only needed for postal codes that do not exist yet.').classes('text-gray-600 text-sm mb-2')
+                            progress_bar = ui.linear_progress(value=0, show_value=False).classes('w-full')
+                            progress_bar.set_visibility(False)
+                            result_area = ui.column().classes('w-full')
+                            
+                            async def handle_upload(e):
+                                admin_id = user.get('admin_id')
+                                if not admin_id:
+                                    ui.notify('Admin session invalid. Please relogin.', type='negative')
+                                    return
+                                try:
+                                    rows = parse_rooms_file(e.file.name, await e.file.read())
+                                except (ValueError, csv.Error) as err:
+                                    ui.notify(f'Could not read file: {err}', type='negative')
+                                    return
                                 
-                                table.add_slot('body-cell-actions', r'''
-                                    <q-td :props="props">
-                                        <q-btn icon="delete" size="sm" color="red" @click="$parent.$emit('delete', props.row)" dense />
-                                    </q-td>
-                                ''')
-                                table.on('delete', delete_room_action)
+                                # The import runs on a worker thread; a timer copies its progress into the UI
+                                def on_progress(processed, total):
+                                    import_state.update(processed=processed, total=total)
+                                
+                                progress_bar.set_visibility(True)
+                                timer = ui.timer(0.2, lambda: progress_bar.set_value(import_state['processed'] / max(import_state['total'], 1)))
+                                try:
+                                    result = await run_db(import_rooms, rows, admin_id, IMPORT_CHUNK_SIZE, on_progress)
+                                finally:
+                                    timer.cancel()
+                                progress_bar.set_value(1)
+                                import_state['imported'] += result['imported']
+                                
+                                result_area.clear()
+                                with result_area:
+                                    ui.label(f"Imported {result['imported']} of {len(rows)} rows").classes('font-bold')
+                                    for number, message in result['errors'][:50]:
+                                        ui.label(f'Row {number}: {message}').classes('text-red-600 text-sm')
+                                    if len(result['errors']) > 50:
+                                        ui.label(f"... and {len(result['errors']) - 50} more errors").classes('text-red-600 text-sm')
+                            
+                            ui.upload(on_upload=handle_upload, auto_upload=True).props('accept=".csv,.json"').classes('w-full')
+                            ui.button('Close', on_click=dialog.close).classes('bg-gray-500 text-white mt-2')
+                        
+                        dialog.open()
+                    
+                    with ui.row().classes('gap-2'):
+                        ui.button('+ Add New Room', on_click=show_add_room_dialog).classes('bg-green-600 text-white mb-4')
+                        ui.button('Import Rooms', on_click=show_import_dialog).classes('bg-blue-600 text-white mb-4')
+                    
+                    no_rooms_label = ui.label('No rooms available').classes('text-gray-500')
+                    
+                    # The table is built once; reloads and deletes only patch its rows
+                    columns = [
+                        {'name': 'id', 'label': 'ID', 'field': 'Room_id'},
+                        {'name': 'location', 'label': 'Location', 'field': 'city'},
+                        {'name': 'price', 'label': 'Price', 'field': 'price'},
+                        {'name': 'description', 'label': 'Description', 'field': 'description'},
+                        {'name': 'actions', 'label': 'Actions', 'field': 'actions'}
+                    ]
+                    rooms_table = ui.table(columns=columns, rows=[], row_key='Room_id').classes('w-full')
+                    rooms_table.add_slot('body-cell-actions', r'''
+                        <q-td :props="props">
+                            <q-btn icon="delete" size="sm" color="red" @click="$parent.$emit('delete', props.row)" dense />
+                        </q-td>
+                    ''')
+                    
+                    def room_row(r):
+                        return {
+                            'Room_id': r['Room_id'],
+                            'city': f"{r.get('city', '')}, {r.get('area', '')}",
+                            'price': f"TK {r['price']}",
+                            'description': r.get('description', '')[:50] + '...' if r.get('description') else '',
+                            'actions': ''
+                        }
+                    
+                    def show_rooms_table():
+                        no_rooms_label.set_visibility(not rooms_table.rows)
+                        rooms_table.set_visibility(bool(rooms_table.rows))
+                    
+                    async def load_admin_rooms():
+                        rooms = await run_db(get_all_rooms)
+                        sync_rows(rooms_table, [room_row(r) for r in rooms or []])
+                        show_rooms_table()
                     
-                    load_admin_rooms()
+                    async def delete_room_action(evt):
+                        row = evt.args
+                        success, message = await run_db(delete_room, row['Room_id'])
+                        ui.notify(message, type='positive' if success else 'negative')
+                        if success:
+                            rooms_table.remove_rows([row])
+                            show_rooms_table()
+                    
+                    rooms_table.on('delete', delete_room_action)
+                    await load_admin_rooms()
                 
                 # ========== MANAGE BOOKINGS TAB ==========
                 with ui.tab_panel(bookings_tab):
-                    bookings_container = ui.column().classes('w-full')
+                    with ui.row().classes('w-full items-center gap-2 mb-4'):
+                        selection_label = ui.label('0 selected').classes('text-gray-600')
+                        ui.button('Confirm selected', on_click=lambda: bulk_update('Confirmed')).classes('bg-green-600 text-white')
+                        ui.button('Cancel selected', on_click=lambda: bulk_update('Cancelled')).classes('bg-red-500 text-white')
+                        ui.button('Complete selected', on_click=lambda: bulk_update('Completed')).classes('bg-blue-500 text-white')
+                        ui.space()
+                        ui.button('Export CSV', on_click=lambda: ui.download.from_url('/admin/export/bookings.csv')).classes('bg-blue-600 text-white')
+                        ui.button('Export NDJSON', on_click=lambda: ui.download.from_url('/admin/export/bookings.ndjson')).classes('bg-blue-600 text-white')
                     
-                    def load_admin_bookings():
-                        bookings_container.clear()
-                        
-                        with bookings_container:
-                            bookings = get_all_bookings()
-                            
-                            if not bookings:
-                                ui.label('No bookings yet').classes('text-gray-500')
-                            else:
-                                for booking in bookings:
-                                    with ui.card().classes('w-full p-4 mb-4'):
-                                        with ui.row().classes('w-full items-center justify-between'):
-                                            with ui.column():
-                                                ui.label(f"User: {booking['user_name']} ({booking['user_email']})").classes('font-bold')
-                                                ui.label(f"Room: {booking.get('city', 'Unknown')}, {booking.get('area', '')}").classes('text-gray-700')
-                                                ui.label(f"{booking['check_in_date']} to {booking['check_out_date']}").classes('text-gray-600')
-                                                ui.label(f"Total: TK {booking['Total_cost']:.2f}").classes('text-blue-600 font-bold')
-                                            
-                                            def update_status(e, booking_id):
-                                                success, message = update_booking_status(booking_id, e.value)
-                                                ui.notify(message, type='positive' if success else 'negative')
-                                                if success:
-                                                    load_admin_bookings()
-                                            
-                                            ui.select(
-                                                ['Pending', 'Confirmed', 'Cancelled', 'Completed'],
-                                                value=booking['status'],
-                                                label='Status',
-                                                on_change=lambda e, bid=booking['booking_id']: update_status(e, bid)
-                                            )
+                    no_bookings_label = ui.label('No bookings yet').classes('text-gray-500')
+                    
+                    # Virtual scrolling keeps only the visible rows in the DOM;
+                    # further pages are fetched as the user nears the end.
+                    booking_columns = [
+                        {'name': 'user', 'label': 'User', 'field': 'user', 'align': 'left'},
+                        {'name': 'room', 'label': 'Room', 'field': 'room', 'align': 'left'},
+                        {'name': 'dates', 'label': 'Dates', 'field': 'dates', 'align': 'left'},
+                        {'name': 'total', 'label': 'Total', 'field': 'total'},
+                        {'name': 'status', 'label': 'Status', 'field': 'status'}
+                    ]
+                    bookings_table = ui.table(
+                        columns=booking_columns, rows=[], row_key='booking_id', pagination={'rowsPerPage': 0},
+                        selection='multiple', on_select=lambda: selection_label.set_text(f'{len(bookings_table.selected)} selected')
+                    ).props('virtual-scroll').classes('w-full h-[70vh]')
+                    bookings_table.add_slot('body-cell-status', r'''
+                        <q-td :props="props">
+                            <q-select dense :model-value="props.row.status"
+                                :options="['Pending', 'Confirmed', 'Cancelled', 'Completed']"
+                                @update:model-value="value => $parent.$emit('status', {booking_id: props.row.booking_id, status: value})" />
+                        </q-td>
+                    ''')
+                    
+                    bookings_state = {'cursor': None, 'done': True, 'loading': False}
+                    
+                    def booking_row(booking):
+                        return {
+                            'booking_id': booking['booking_id'],
+                            'user': f"{booking['user_name']} ({booking['user_email']})",
+                            'room': f"{booking.get('city', 'Unknown')}, {booking.get('area', '')}",
+                            'dates': f"{booking['check_in_date']} to {booking['check_out_date']}",
+                            'total': f"TK {booking['Total_cost']:.2f}",
+                            'status': booking['status']
+                        }
+                    
+                    async def load_more_bookings(replace=False):
+                        if bookings_state['loading'] or bookings_state['done']:
+                            return
+                        bookings_state['loading'] = True
+                        try:
+                            bookings, cursor = await run_db(get_bookings_page, bookings_state['cursor'], BOOKING_PAGE_SIZE)
+                        finally:
+                            bookings_state['loading'] = False
+                        bookings_state['cursor'] = cursor
+                        bookings_state['done'] = cursor is None
+                        rows = [booking_row(b) for b in bookings or []]
+                        if replace:
+                            sync_rows(bookings_table, rows)
+                        else:
+                            bookings_table.add_rows(rows)
+                        no_bookings_label.set_visibility(not bookings_table.rows)
+                        bookings_table.set_visibility(bool(bookings_table.rows))
                     
-                    load_admin_bookings()
+                    async def load_admin_bookings():
+                        bookings_state.update(cursor=None, done=False, loading=False)
+                        await load_more_bookings(replace=True)
+                    
+                    def on_bookings_scroll(e):
+                        if e.args.get('to', 0) >= len(bookings_table.rows) - 10:
+                            return load_more_bookings()
+                    
+                    def patch_status(booking_ids, new_status, clear_selection=False):
+                        # Only the changed rows are sent; nothing is re-queried
+                        patch_rows(bookings_table, {booking_id: {'status': new_status} for booking_id in booking_ids},
+                                   clear_selection)
+                    
+                    async def update_status(e):
+                        booking_id, new_status = e.args['booking_id'], e.args['status']
+                        success, message = await run_db(update_booking_status, booking_id, new_status)
+                        ui.notify(message, type='positive' if success else 'negative')
+                        if success:
+                            patch_status([booking_id], new_status)
+                    
+                    async def bulk_update(new_status):
+                        booking_ids = [row['booking_id'] for row in bookings_table.selected]
+                        if not booking_ids:
+                            ui.notify('Select bookings first', type='warning')
+                            return
+                        success, message = await run_db(update_booking_statuses, booking_ids, new_status)
+                        ui.notify(message, type='positive' if success else 'negative')
+                        if success:
+                            selection_label.set_text('0 selected')
+                            patch_status(booking_ids, new_status, clear_selection=True)
+                    
+                    bookings_table.on('virtual-scroll', on_bookings_scroll)
+                    bookings_table.on('status', update_status)
+                    await load_admin_bookings()
+
+    # ==================== ADMIN EXPORTS ====================
+    @app.get('/admin/export/bookings.{fmt}')
+    def export_bookings(fmt: str):
+        user = app.storage.user.get('user')
+        if not user or user.get('user_type') != 'admin':
+            return PlainTextResponse('Forbidden', status_code=403)
+        if fmt not in EXPORT_FORMATS:
+            return PlainTextResponse('Unknown export format', status_code=404)
+        
+        # The sync generator is iterated on a worker thread, chunk by chunk
+        generate, media_type = EXPORT_FORMATS[fmt]
+        return StreamingResponse(
+            generate(),
+            media_type=media_type,
+            headers={'Content-Disposition': f'attachment; filename="bookings.{fmt}"'}
+        )
+
+    # ==================== METRICS ====================
+    if os.getenv('METRICS_ENDPOINT', '1') == '1':
+        @app.get('/metrics')
+        def metrics_endpoint():
+            # Point-in-time gauges alongside the recorded counters and histograms
+            gauges = [(f'roomify_db_pool_{key}', (), value) for key, value in get_pool().stats().items()]
+            gauges += [(f'roomify_db_replica_pool_{key}', (('replica', address),), value)
+                       for address, pool in get_replica_pools() for key, value in pool.stats().items()]
+            gauges += [(f'roomify_room_cache_{key}', (), value) for key, value in room_cache.stats().items()]
+            return PlainTextResponse(metrics.render(gauges), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,183 @@
+"""Multi-worker mode: several app processes behind one port.
+
+NiceGUI keeps each page's elements in the process that rendered it, and
+the page's websocket must reach that same process. The supervisor below
+starts WEB_WORKERS copies of the app on loopback ports and forwards the
+public port to them with a small TCP proxy that pins every browser to
+one worker with a cookie. The browser's pages, websocket and
+app.storage.user file are therefore always handled by one process.
+
+Workers keep their caches and indexes coherent over the invalidation bus
+(backend.invalidation) in a temporary directory shared by all of them.
+"""
+import asyncio
+import itertools
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from http.cookies import CookieError, SimpleCookie
+
+AFFINITY_COOKIE = 'roomify_worker'
+MAX_HEADER_BYTES = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+RESTART_DELAY = 1.0
+
+
+def worker_ports(port, workers):
+    base = int(os.getenv('WEB_WORKER_BASE_PORT', port + 1))
+    return [base + i for i in range(workers)]
+
+
+class StickyProxy:
+    """Forward connections to worker ports, keeping each browser on one worker."""
+
+    def __init__(self, ports):
+        self.ports = ports
+        self._next = itertools.cycle(range(len(ports)))
+        self.connections = set()
+
+    async def handle(self, client_reader, client_writer):
+        upstream_writer = None
+        self.connections.add(client_writer)
+        try:
+            try:
+                head = await client_reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            pinned = self._pinned_worker(head)
+            worker, (upstream_reader, upstream_writer) = await self._connect(pinned)
+            cookie = None
+            if worker != pinned:
+                cookie = f"{AFFINITY_COOKIE}={worker}; Path=/; HttpOnly; SameSite=Lax"
+                # One request per connection until pinned, so every page response can set the cookie
+                head = self._close_after_response(head)
+            upstream_writer.write(head)
+            sending = asyncio.ensure_future(self._pipe(client_reader, upstream_writer))
+            try:
+                await self._pipe(upstream_reader, client_writer, cookie)
+            finally:
+                # The worker closed its side; the request body (if any) is no longer needed
+                sending.cancel()
+        except OSError:
+            pass
+        finally:
+            self.connections.discard(client_writer)
+            for writer in (client_writer, upstream_writer):
+                if writer is not None:
+                    writer.close()
+
+    def _pinned_worker(self, head):
+        for line in head.split(b'\r\n')[1:]:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() != b'cookie':
+                continue
+            try:
+                morsel = SimpleCookie(value.decode('latin-1')).get(AFFINITY_COOKIE)
+            except CookieError:
+                return None
+            if morsel and morsel.value.isdigit() and int(morsel.value) < len(self.ports):
+                return int(morsel.value)
+        return None
+
+    @staticmethod
+    def _close_after_response(head):
+        lines = head[:-4].split(b'\r\n')
+        if any(line.lower().startswith(b'upgrade:') for line in lines):
+            return head
+        lines = [line for line in lines if not line.lower().startswith(b'connection:')]
+        return b'\r\n'.join(lines + [b'Connection: close']) + b'\r\n\r\n'
+
+    async def _connect(self, pinned):
+        # A pinned browser whose worker is down moves to the next one that answers
+        candidates = [pinned] if pinned is not None else []
+        candidates += [next(self._next) for _ in self.ports]
+        for worker in candidates:
+            try:
+                return worker, await asyncio.open_connection('127.0.0.1', self.ports[worker])
+            except OSError:
+                continue
+        raise ConnectionRefusedError("No worker is accepting connections")
+
+    @staticmethod
+    async def _pipe(reader, writer, cookie=None):
+        try:
+            if cookie:
+                # Pages pin the browser; scripts and styles loading alongside
+                # may come from any worker and must not move the pin
+                head = await reader.readuntil(b'\r\n\r\n')
+                status_line, _, rest = head.partition(b'\r\n')
+                if any(line.lower().startswith(b'content-type:') and b'text/html' in line.lower()
+                       for line in rest.split(b'\r\n')):
+                    head = status_line + b'\r\nSet-Cookie: ' + cookie.encode() + b'\r\n' + rest
+                writer.write(head)
+            while True:
+                data = await reader.read(CHUNK_SIZE)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            if writer.can_write_eof():
+                try:
+                    writer.write_eof()
+                except OSError:
+                    pass
+
+
+def _spawn(port, bus_directory, scheduler):
+    env = dict(os.environ, WEB_WORKER_PORT=str(port), INVALIDATION_DIR=bus_directory)
+    if not scheduler:
+        # One worker sweeps booking transitions for all of them
+        env['BOOKING_SCHEDULER'] = '0'
+    return subprocess.Popen([sys.executable, os.path.abspath(sys.argv[0])], env=env)
+
+async def _supervise(host, port, ports, bus_directory):
+    processes = {worker_port: _spawn(worker_port, bus_directory, worker_port == ports[0]) for worker_port in ports}
+    proxy = StickyProxy(ports)
+    server = await asyncio.start_server(proxy.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Roomify serving {len(ports)} workers on http://{host}:{port}")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        while not stop.is_set():
+            for worker_port, process in list(processes.items()):
+                if process.poll() is not None:
+                    print(f"Worker on port {worker_port} exited with {process.returncode}; restarting")
+                    processes[worker_port] = _spawn(worker_port, bus_directory, worker_port == ports[0])
+            try:
+                await asyncio.wait_for(stop.wait(), RESTART_DELAY)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        server.close()
+        for process in processes.values():
+            process.terminate()
+        deadline = time.monotonic() + 10
+        # Keep proxying while the workers shut down so they can close their websockets
+        while time.monotonic() < deadline and any(process.poll() is None for process in processes.values()):
+            await asyncio.sleep(0.1)
+        for process in processes.values():
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        for writer in list(proxy.connections):
+            writer.close()
+        deadline = time.monotonic() + 1
+        while proxy.connections and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+def run_workers(workers, host='0.0.0.0', port=8080):
+    """Start the workers and the sticky proxy; returns when interrupted."""
+    bus_directory = tempfile.mkdtemp(prefix='roomify-bus-')
+    try:
+        asyncio.run(_supervise(host, port, worker_ports(port, workers), bus_directory))
+    finally:
+        shutil.rmtree(bus_directory, ignore_errors=True)
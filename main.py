@@ -1,14 +1,59 @@
 import os
-from nicegui import ui
+import socket
+from nicegui import ui, app
 from frontend.ui import create_pages
+from frontend.workers import run_workers
+from backend.availability import load_availability_index
+from backend.hashing import get_hashing_service
+from backend.images import get_image_pipeline
+from backend.invalidation import start_bus, stop_bus
+from backend.lifecycle import start_scheduler, stop_scheduler
+from backend.occupancy import ensure_occupancy_calendar
+from backend.search_index import load_search_index
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def stop_pools():
+    """Stop the hashing and image process pools so no pool process outlives the app."""
+    get_hashing_service().shutdown(wait=True)
+    pipeline = get_image_pipeline()
+    if pipeline is not None:
+        pipeline.shutdown(wait=True)
+
 def main():
+    workers = int(os.getenv('WEB_WORKERS', '1'))
+    worker_port = os.getenv('WEB_WORKER_PORT')
+    if workers > 1 and not worker_port:
+        if hasattr(socket, 'AF_UNIX'):
+            # Supervisor: start the workers and the proxy in front of them
+            run_workers(workers, host=os.getenv('HOST', '0.0.0.0'), port=int(os.getenv('PORT', '8080')))
+            return
+        print("WEB_WORKERS needs Unix sockets; running a single process")
+
     # Load all pages
     create_pages()
-    
+
+    if worker_port:
+        # Join the invalidation bus before the indexes load, so no change is missed
+        app.on_startup(start_bus)
+        app.on_shutdown(stop_bus)
+
+    # Warm in-process indexes before serving requests
+    app.on_startup(load_availability_index)
+    app.on_startup(load_search_index)
+    app.on_startup(ensure_occupancy_calendar)
+    # Complete or cancel finished stays in the background
+    app.on_startup(start_scheduler)
+    app.on_shutdown(stop_scheduler)
+    app.on_shutdown(stop_pools)
+
+    if worker_port:
+        # Worker of a multi-worker deployment, reached through the supervisor's proxy
+        ui.run(title='Roomify', host='127.0.0.1', port=int(worker_port), reload=False, show=False,
+               storage_secret=os.getenv('STORAGE_SECRET', 'fallback_secret_if_env_missing'))
+        return
+
     # Run the app
     ui.run(title='Roomify', storage_secret=os.getenv('STORAGE_SECRET', 'fallback_secret_if_env_missing'))
 
@@ -0,0 +1,13 @@
+-- Composite indexes for availability checks, booking history and location search.
+
+-- Availability: equality on room_id, IN on status, range on the stay dates
+CREATE INDEX idx_booking_room_status_dates
+    ON Booking (room_id, status, check_in_date, check_out_date);
+
+-- My Bookings: bookings of one user ordered by check-in
+CREATE INDEX idx_booking_user_checkin
+    ON Booking (user_id, check_in_date);
+
+-- Search by city / area
+CREATE INDEX idx_location_city_area
+    ON Location (city, area);
@@ -0,0 +1,4 @@
+-- Admin booking list: keyset pagination ordered by (check_in_date, booking_id).
+-- InnoDB appends the primary key to secondary indexes, so this covers both columns.
+CREATE INDEX idx_booking_checkin
+    ON Booking (check_in_date);
@@ -0,0 +1,3 @@
+-- Content hash of the room's ingested image; variants live in IMAGE_STORE
+-- under this key. NULL until the image pipeline has processed image_url.
+ALTER TABLE Room ADD COLUMN image_key CHAR(64) NULL;
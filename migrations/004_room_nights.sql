@@ -0,0 +1,16 @@
+-- Occupancy calendar: one row per night of every Pending/Confirmed stay.
+-- Maintained by the booking write paths; the primary key both serves the
+-- per-room calendar range scan and refuses a second stay on a taken night.
+-- Existing bookings are copied in by `python -m backend.occupancy`
+-- (run automatically on startup while the table is empty).
+CREATE TABLE RoomNight (
+    room_id INT NOT NULL,
+    night DATE NOT NULL,
+    booking_id INT NOT NULL,
+    PRIMARY KEY (room_id, night),
+    FOREIGN KEY (room_id) REFERENCES Room(Room_id) ON DELETE CASCADE,
+    FOREIGN KEY (booking_id) REFERENCES Booking(booking_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_roomnight_booking
+    ON RoomNight (booking_id);
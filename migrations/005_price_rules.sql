@@ -0,0 +1,17 @@
+-- Per-night price overrides (weekend, seasonal, ...). A rule applies to one
+-- room, or to every room when room_id is NULL, on the nights between
+-- start_date and end_date (inclusive; NULL leaves that side open) whose
+-- weekday bit is set in weekdays (Monday = 1 ... Sunday = 64; NULL = all).
+-- It sets either a fixed nightly price or a multiplier of the room's
+-- price. Where rules overlap, the highest rule_id wins.
+CREATE TABLE PriceRule (
+    rule_id INT AUTO_INCREMENT PRIMARY KEY,
+    label VARCHAR(100),
+    room_id INT NULL,
+    start_date DATE NULL,
+    end_date DATE NULL,
+    weekdays INT NULL,
+    price DECIMAL(10, 2) NULL,
+    multiplier DECIMAL(5, 2) NULL,
+    FOREIGN KEY (room_id) REFERENCES Room(Room_id) ON DELETE CASCADE
+);
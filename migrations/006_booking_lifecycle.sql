@@ -0,0 +1,4 @@
+-- Booking lifecycle (backend/lifecycle.py). The scheduler's sweeps select
+-- finished stays by status and check-out date.
+CREATE INDEX idx_booking_status_checkout
+    ON Booking (status, check_out_date);
@@ -0,0 +1,26 @@
+from datetime import date
+from backend.pricing import FRIDAY, SATURDAY, quote_stays
+
+ROOMS = [{'Room_id': 1, 'price': 100}, {'Room_id': 2, 'price': 50}]
+
+def rule(rule_id, room_id=None, weekdays=None, price=None, multiplier=None):
+    return {'rule_id': rule_id, 'room_id': room_id, 'start_date': None, 'end_date': None,
+            'weekdays': weekdays, 'price': price, 'multiplier': multiplier}
+
+
+def test_no_rules_charge_the_room_price():
+    totals, nights = quote_stays(ROOMS, date(2030, 1, 7), date(2030, 1, 10), rules=[])
+    assert nights == 3
+    assert list(totals) == [300, 150]
+
+
+def test_weekend_multiplier_and_fixed_price():
+    # Thursday to Sunday: the Friday and Saturday nights are weekend nights
+    rules = [rule(1, weekdays=FRIDAY | SATURDAY, multiplier=1.5), rule(2, room_id=2, price=80)]
+    totals, _ = quote_stays(ROOMS, date(2030, 1, 10), date(2030, 1, 13), rules=rules)
+    assert list(totals) == [100 + 150 + 150, 80 * 3]
+
+
+def test_rule_without_price_or_multiplier_is_skipped():
+    totals, _ = quote_stays(ROOMS, date(2030, 1, 7), date(2030, 1, 9), rules=[rule(1)])
+    assert list(totals) == [200, 100]
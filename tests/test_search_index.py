@@ -0,0 +1,87 @@
+import pytest
+from backend import rooms
+from backend.search_index import RoomSearchIndex, one_edit_apart
+
+ROOMS = [
+    {'Room_id': 1, 'city': 'New York', 'area': 'Manhattan', 'description': 'Bright loft near the park'},
+    {'Room_id': 2, 'city': 'London', 'area': 'Camden', 'description': 'Quiet studio with a garden'},
+    {'Room_id': 3, 'city': 'Newcastle', 'area': 'Quayside', 'description': 'River view apartment'},
+    {'Room_id': 4, 'city': 'Dhaka', 'area': 'Gulshan', 'description': 'Family flat with balcony'},
+]
+
+@pytest.fixture
+def index():
+    index = RoomSearchIndex()
+    index.load(ROOMS)
+    return index
+
+
+@pytest.mark.parametrize('query, room_id', [
+    ('new york', 1),        # exact
+    ('new yo', 1),          # prefix, as typed
+    ('new yrok', 1),        # swapped letters
+    ('nwe york', 1),        # swapped letters in a short word
+    ('new yorkk', 1),       # extra letter
+    ('new yrk', 1),         # missing letter
+    ('new yirk', 1),        # wrong letter
+    ('londn', 2),           # missing letter
+    ('lodnon', 2),          # swapped letters
+    ('manhatan', 1),        # missing letter, long word
+    ('balcny dhka', 4),     # a typo in every word
+])
+def test_typos_that_match(index, query, room_id):
+    assert index.search(query)[0] == room_id
+
+
+@pytest.mark.parametrize('query', [
+    'yrko',                 # two edits in a short word
+    'ldnon',                # missing letter plus a swap
+    'tokyo',                # not in the index at all
+])
+def test_typos_that_do_not_match(index, query):
+    assert index.search(query) == []
+
+
+def test_every_query_word_must_match(index):
+    assert index.search('london balcony') == []
+
+
+def test_removed_rooms_stop_matching_typos(index):
+    index.remove_room(1)
+    assert index.search('new yrok') == []
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ('york', 'yrok', True),
+    ('york', 'yorkk', True),
+    ('york', 'yrk', True),
+    ('york', 'yirk', True),
+    ('york', 'york', False),
+    ('york', 'yrko', False),
+    ('york', 'ky', False),
+])
+def test_one_edit_apart(a, b, expected):
+    assert one_edit_apart(a, b) is expected
+    assert one_edit_apart(b, a) is expected
+
+
+def test_search_rooms_bounds_index_matches_per_statement(monkeypatch):
+    index = RoomSearchIndex()
+    index.load([{'Room_id': room_id, 'city': 'Dhaka', 'area': 'Central', 'description': ''}
+                for room_id in range(1, 1201)])
+    statements = []
+
+    def fake_read(query, params=()):
+        statements.append(params)
+        return [{'Room_id': room_id} for room_id in params if isinstance(room_id, int)]
+
+    monkeypatch.setattr(rooms, 'search_index', index)
+    monkeypatch.setattr(rooms, 'execute_read_query', fake_read)
+
+    found = rooms.search_rooms('d', limit=30)
+    assert len(found) == 30
+    assert statements == [tuple(range(1, 31))]
+
+    found = rooms.search_rooms('d')
+    assert [room['Room_id'] for room in found] == list(range(1, 1201))
+    assert max(len(params) for params in statements[1:]) == rooms.SEARCH_CHUNK_SIZE